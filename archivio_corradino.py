@@ -0,0 +1,114 @@
+# archivio_corradino.py
+# Archivio multi-stagione: leggo in parallelo un file per stagione (per tenuta),
+# li unisco con uno schema categorico comune e preparo gli aggregati per il confronto tra annate.
+
+import glob
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from kpi_corradino import calcola_kpi, num_sicuro
+
+COLONNE_CATEGORICHE = ["vigneto", "vitigno"]
+
+# con pyarrow installato il parsing del CSV rilascia il GIL: i thread leggono davvero in parallelo.
+# Sui file piccoli il motore C resta più veloce (pyarrow ha un costo fisso di qualche ms),
+# quindi in automatico lo uso solo oltre questa dimensione
+SOGLIA_PYARROW = 1_000_000  # byte
+try:
+    import pyarrow  # noqa: F401
+    MOTORE_CSV = "pyarrow"
+except ImportError:
+    MOTORE_CSV = "c"
+
+# tipo che pd.to_datetime dà alle date lette come testo (la risoluzione cambia tra pandas 2 e 3)
+TIPO_DATA = pd.to_datetime(pd.Series(["2000-01-01"])).dtype
+
+def elenca_file(sorgente: str) -> list[Path]:
+    """Risolvo la sorgente: un CSV singolo, una cartella (tutti i *.csv) oppure un glob."""
+    p = Path(sorgente)
+    if p.is_dir():
+        file = sorted(p.glob("*.csv"))
+    elif glob.has_magic(sorgente):
+        file = sorted(Path(x) for x in glob.glob(sorgente))
+    else:
+        file = [p]
+    if not file:
+        raise FileNotFoundError(f"Nessun CSV trovato in {sorgente}")
+    return file
+
+def anno_da_nome(percorso: Path) -> int:
+    """Anno nel nome del file (es. vendemmia_2024.csv); 0 se non c'è."""
+    trovato = re.search(r"(19|20)\d{2}", Path(percorso).stem)
+    return int(trovato.group(0)) if trovato else 0
+
+def leggi_stagione(percorso: Path, col_data: str | None = None, motore: str | None = None) -> pd.DataFrame:
+    """Leggo un file e aggiungo la colonna 'stagione': l'anno della data di ogni riga
+    (un file può contenere più annate); l'anno del nome file lo uso solo senza date."""
+    if motore is None:
+        motore = MOTORE_CSV if os.path.getsize(percorso) >= SOGLIA_PYARROW else "c"
+    tipi = {c: "category" for c in COLONNE_CATEGORICHE}
+    df = pd.read_csv(percorso, dtype=tipi, engine=motore)
+    if motore == "pyarrow":
+        # pyarrow riconosce da solo le date e le ritorna come oggetti date: quelle che non converto
+        # sotto le riporto a testo come fa il motore C, così il risultato non dipende dal motore
+        for c in df.columns[df.dtypes == object]:
+            if c != col_data and pd.api.types.infer_dtype(df[c], skipna=True) in ("date", "datetime"):
+                df[c] = df[c].astype(str)
+    if col_data and col_data in df.columns:
+        df[col_data] = pd.to_datetime(df[col_data], errors="coerce").astype(TIPO_DATA)
+        df["stagione"] = df[col_data].dt.year.fillna(anno_da_nome(percorso)).astype("int64")
+    else:
+        df["stagione"] = anno_da_nome(percorso)
+    return df
+
+def uniforma_categorie(frame: list[pd.DataFrame]) -> list[pd.DataFrame]:
+    """Porto le colonne categoriche di tutti i file sulle stesse categorie (unione ordinata)."""
+    for col in COLONNE_CATEGORICHE:
+        presenti = [df[col] for df in frame if col in df.columns]
+        if not presenti:
+            continue
+        categorie = sorted(set().union(*(s.cat.categories for s in presenti)))
+        tipo = pd.CategoricalDtype(categorie)
+        for df in frame:
+            if col in df.columns:
+                df[col] = df[col].astype(tipo)
+    return frame
+
+def carica_archivio(sorgente: str, col_data: str | None = None,
+                    max_thread: int | None = None, motore: str | None = None) -> pd.DataFrame:
+    """Carico tutti i file della sorgente in parallelo (thread pool) e li concateno in un unico DataFrame."""
+    file = elenca_file(sorgente)
+    n_thread = max_thread or min(len(file), os.cpu_count() or 4)
+    if len(file) == 1 or n_thread == 1:
+        frame = [leggi_stagione(p, col_data, motore) for p in file]
+    else:
+        with ThreadPoolExecutor(max_workers=n_thread) as pool:
+            frame = list(pool.map(lambda p: leggi_stagione(p, col_data, motore), file))
+    return pd.concat(uniforma_categorie(frame), ignore_index=True)
+
+def prepara_condiviso(df: pd.DataFrame, col_data: str | None = None) -> pd.DataFrame:
+    """Ordino per data una volta sola: così il dataset può essere condiviso tra sessioni e
+    i filtri per intervallo diventano fette (viste) invece di copie."""
+    if col_data and col_data in df.columns and not df[col_data].is_monotonic_increasing:
+        df = df.sort_values(col_data, kind="stable", ignore_index=True)
+    return df
+
+def aggregati_stagione(df: pd.DataFrame) -> pd.DataFrame:
+    """KPI di sintesi per stagione (una riga per annata), con gli stessi calcoli della dashboard."""
+    righe = [{"stagione": stagione, **calcola_kpi(g)}
+             for stagione, g in df.groupby("stagione", sort=True)]
+    return pd.DataFrame(righe)
+
+def curve_giornaliere(df: pd.DataFrame) -> pd.DataFrame:
+    """Raccolto giornaliero e cumulato per stagione, allineato sul giorno di vendemmia (0 = primo giorno)."""
+    g = (df.assign(raccolto_kg=num_sicuro(df, "raccolto_kg").fillna(0))
+         .groupby(["stagione", "data"], as_index=False)["raccolto_kg"].sum()
+         .sort_values(["stagione", "data"]))
+    inizio = g.groupby("stagione")["data"].transform("min")
+    g["giorno_vendemmia"] = (g["data"] - inizio).dt.days
+    g["raccolto_cumulato_kg"] = g.groupby("stagione")["raccolto_kg"].cumsum()
+    return g
@@ -0,0 +1,211 @@
+# comune_corradino.py
+# Funzioni condivise dalle pagine della dashboard Cantina Corradino
+# (caricamento dati, sidebar con filtri, KPI e grafici adattivi)
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from archivio_corradino import carica_archivio, prepara_condiviso
+from kpi_corradino import applica_filtri, prendi_righe, righe_filtrate
+
+# -------------------------
+# utilità di base
+# -------------------------
+# con pandas 2.x attivo il Copy-on-Write (da pandas 3 è sempre attivo): una sessione che
+# modifica i valori ne ottiene una copia privata. Il CoW non protegge le modifiche all'oggetto
+# stesso (nuove colonne, rinomina...): per questo alle pagine passo solo copie superficiali
+# o fette, mai il DataFrame in cache
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+@st.cache_resource(show_spinner="Carico i dati…")
+def carica_csv(percorso: str, col_data: str | None = None) -> pd.DataFrame:
+    """Carico un CSV (o una cartella/glob con un CSV per stagione) una volta per tutto il server.
+
+    Con cache_resource tutte le sessioni ricevono lo stesso oggetto, senza la copia per sessione
+    di cache_data: per questo il risultato va trattato come sola lettura.
+    """
+    return prepara_condiviso(carica_archivio(percorso, col_data), col_data)
+
+# soglie per il rendering adattivo dei grafici con tanti punti
+SOGLIA_WEBGL = 2_000      # oltre questo numero di punti uso le tracce WebGL
+SOGLIA_BINNING = 20_000   # oltre questo numero aggrego i punti in celle esagonali
+N_CELLE_HEX = 30          # celle lungo l'asse x della griglia esagonale
+
+def hexbin_punti(df: pd.DataFrame, x: str, y: str, per: list[str],
+                 n_celle: int = N_CELLE_HEX) -> pd.DataFrame:
+    """Aggrego i punti in celle esagonali (per gruppo); ritorno centri cella e conteggi."""
+    vx = df[x].to_numpy(dtype=float)
+    vy = df[y].to_numpy(dtype=float)
+    x_min, x_max = float(vx.min()), float(vx.max())
+    y_min, y_max = float(vy.min()), float(vy.max())
+    # passo della griglia: stesso schema di matplotlib.hexbin (ny = nx / sqrt(3))
+    sx = (x_max - x_min) / n_celle or 1.0
+    sy = (y_max - y_min) / max(1, int(round(n_celle / np.sqrt(3)))) or 1.0
+    ix = (vx - x_min) / sx
+    iy = (vy - y_min) / sy
+
+    # due reticoli sfalsati: tengo il centro più vicino
+    i1, j1 = np.round(ix), np.round(iy)
+    i2, j2 = np.floor(ix), np.floor(iy)
+    d1 = (ix - i1) ** 2 + 3.0 * (iy - j1) ** 2
+    d2 = (ix - i2 - 0.5) ** 2 + 3.0 * (iy - j2 - 0.5) ** 2
+    primo = d1 < d2
+    cx = np.where(primo, i1, i2 + 0.5)
+    cy = np.where(primo, j1, j2 + 0.5)
+
+    celle = df[per].copy()
+    celle[x] = x_min + cx * sx
+    celle[y] = y_min + cy * sy
+    return (celle.groupby(per + [x, y], as_index=False, observed=True)
+            .size().rename(columns={"size": "n_misure"}))
+
+def scatter_adattivo(df: pd.DataFrame, x: str, y: str, titolo: str, **kwargs):
+    """Scatter che cresce bene: SVG per pochi punti, WebGL oltre soglia, celle esagonali se sono troppi."""
+    n = len(df)
+    if n > SOGLIA_BINNING:
+        per = [c for c in (kwargs.get("color"), kwargs.get("facet_col")) if c]
+        celle = hexbin_punti(df, x, y, per)
+        return px.scatter(celle, x=x, y=y, size="n_misure", size_max=18,
+                          render_mode="webgl", title=f"{titolo} – densità ({n:,} misure)".replace(",", "."),
+                          **kwargs)
+    return px.scatter(df, x=x, y=y, render_mode="webgl" if n > SOGLIA_WEBGL else "auto",
+                      title=titolo, **kwargs)
+
+def box_da_quantili(df: pd.DataFrame, x: str, y: str, titolo: str) -> go.Figure:
+    """Box plot costruito dai quantili per gruppo (non mando al browser i valori grezzi)."""
+    fig = go.Figure()
+    for gruppo, s in df.groupby(x, observed=True)[y]:
+        s = s.dropna()
+        if s.empty:
+            continue
+        q1, med, q3 = s.quantile([0.25, 0.5, 0.75]).tolist()
+        iqr = q3 - q1
+        # baffi come nel box plot classico: ultimo valore entro 1.5 * IQR
+        baffo_inf = float(s[s >= q1 - 1.5 * iqr].min())
+        baffo_sup = float(s[s <= q3 + 1.5 * iqr].max())
+        fig.add_trace(go.Box(
+            x=[gruppo], name=str(gruppo), q1=[q1], median=[med], q3=[q3],
+            lowerfence=[baffo_inf], upperfence=[baffo_sup], mean=[float(s.mean())],
+            boxpoints=False
+        ))
+    fig.update_layout(title=titolo, xaxis_title=x, yaxis_title=y, showlegend=False)
+    return fig
+
+# -------------------------
+# sorgenti dati (sidebar)
+# -------------------------
+def sidebar_dati() -> tuple[pd.DataFrame | None, pd.DataFrame | None, str | None]:
+    """Leggo i CSV indicati nella sidebar (o caricati a mano); ritorno vendemmia, lotti e
+    il percorso della vendemmia se condivisa dalla cache (None se caricata a mano)."""
+    st.sidebar.header("Sorgente dati")
+    percorso_v = st.sidebar.text_input("CSV vendemmia (file, cartella o glob)", "dati_vendemmia_corradino.csv")
+    percorso_l = st.sidebar.text_input("CSV lotti (opzionale, file, cartella o glob)", "lotti_fermentazione_corradino.csv")
+
+    df_v = None
+    df_l = None
+    sorgente = None
+
+    # vendemmia
+    try:
+        df_v = carica_csv(percorso_v, "data").copy(deep=False)
+        sorgente = percorso_v
+        st.sidebar.success("Vendemmia: file caricato")
+    except Exception as e:
+        st.sidebar.warning(f"Non riesco a leggere {percorso_v}: {e}")
+        up = st.sidebar.file_uploader("Carica vendemmia (CSV)", type=["csv"], key="vendemmia_up")
+        if up:
+            df_v = pd.read_csv(up)
+            if "data" in df_v.columns:
+                df_v["data"] = pd.to_datetime(df_v["data"], errors="coerce")
+            st.sidebar.success("Vendemmia: upload riuscito")
+
+    # lotti
+    try:
+        df_l = carica_csv(percorso_l, "data_inizio").copy(deep=False)
+        st.sidebar.info("Lotti: file caricato (opzionale)")
+    except Exception:
+        up2 = st.sidebar.file_uploader("Carica lotti (CSV) – opzionale", type=["csv"], key="lotti_up")
+        if up2:
+            df_l = pd.read_csv(up2)
+            if "data_inizio" in df_l.columns:
+                df_l["data_inizio"] = pd.to_datetime(df_l["data_inizio"], errors="coerce")
+            st.sidebar.success("Lotti: upload riuscito")
+
+    return df_v, df_l, sorgente
+
+# -------------------------
+# filtri
+# -------------------------
+@st.cache_resource(max_entries=16, ttl="1h", show_spinner=False)
+def righe_condivise(sorgente: str, vigneti: tuple, vitigni: tuple, dal, al, irrigato) -> slice | np.ndarray:
+    """Posizioni delle righe filtrate, condivise tra le sessioni con gli stessi filtri.
+
+    In cache tengo solo le posizioni (al massimo 4 byte per riga), non i DataFrame filtrati:
+    le righe le prendo a ogni esecuzione e vengono liberate a fine rerun.
+    """
+    righe = righe_filtrate(carica_csv(sorgente, "data"), list(vigneti), list(vitigni), dal, al, irrigato)
+    if isinstance(righe, np.ndarray):
+        righe.flags.writeable = False
+    return righe
+
+def filtra_condiviso(sorgente: str, vigneti: tuple, vitigni: tuple, dal, al, irrigato) -> pd.DataFrame:
+    """Filtri applicati al dataset condiviso a partire dalle posizioni in cache."""
+    return prendi_righe(carica_csv(sorgente, "data"), righe_condivise(sorgente, vigneti, vitigni, dal, al, irrigato))
+
+def sidebar_filtri(df_v: pd.DataFrame, sorgente: str | None = None) -> tuple[pd.DataFrame, dict]:
+    """Disegno i filtri nella sidebar e li applico; ritorno i dati filtrati e le scelte fatte."""
+    vigneti = sorted(df_v["vigneto"].dropna().unique().tolist()) if "vigneto" in df_v.columns else []
+    vitigni = sorted(df_v["vitigno"].dropna().unique().tolist()) if "vitigno" in df_v.columns else []
+
+    st.sidebar.header("Filtri")
+    sel_vigneti = st.sidebar.multiselect("Vigneto", vigneti, default=vigneti)
+    sel_vitigni = st.sidebar.multiselect("Vitigno", vitigni, default=vitigni)
+
+    data_min = pd.to_datetime(df_v["data"].min()).date()
+    data_max = pd.to_datetime(df_v["data"].max()).date()
+    sel_range = st.sidebar.date_input("Intervallo date", (data_min, data_max), min_value=data_min, max_value=data_max)
+
+    # filtro irrigazione
+    opzioni_irrig = {"Tutte": None, "Solo irrigate": 1, "Solo non irrigate": 0}
+    scelta_irrig = st.sidebar.selectbox("Irrigazione", list(opzioni_irrig.keys()), index=0)
+
+    # applico filtri; "ricarica" rifà il filtro su richiesta (export, PDF) senza che la sessione
+    # debba tenere le righe filtrate tra un rerun e l'altro: con i dati condivisi tiene solo i filtri
+    dal, al = sel_range if isinstance(sel_range, tuple) and len(sel_range) == 2 else (None, None)
+    if sorgente is not None:
+        ricarica = partial(filtra_condiviso, sorgente, tuple(sel_vigneti), tuple(sel_vitigni),
+                           dal, al, opzioni_irrig[scelta_irrig])
+    else:
+        ricarica = partial(applica_filtri, df_v, sel_vigneti, sel_vitigni, dal, al, opzioni_irrig[scelta_irrig])
+    f = ricarica()
+
+    filtri = {"vigneti": sel_vigneti, "vitigni": sel_vitigni,
+              "periodo": sel_range, "irrigazione": scelta_irrig, "ricarica": ricarica}
+    return f, filtri
+
+def csv_in_byte(dati) -> bytes:
+    """CSV (UTF-8) di un DataFrame o di una funzione che lo ritorna; lo passo come callable a
+    download_button, così il CSV viene creato solo al clic e non resta in memoria nella sessione."""
+    df = dati() if callable(dati) else dati
+    return df.to_csv(index=False).encode("utf-8")
+
+def riassunto_filtri(filtri: dict) -> str:
+    """Riassunto leggibile dei filtri correnti (lo uso nel PDF)."""
+    descr_filtro = []
+    if filtri["vigneti"]: descr_filtro.append("Vigneti: " + ", ".join(filtri["vigneti"]))
+    if filtri["vitigni"]: descr_filtro.append("Vitigni: " + ", ".join(filtri["vitigni"]))
+    sel_range = filtri["periodo"]
+    if isinstance(sel_range, tuple) and len(sel_range) == 2:
+        descr_filtro.append(f"Periodo: {sel_range[0]} → {sel_range[1]}")
+    descr_filtro.append(f"Irrigazione: {filtri['irrigazione']}")
+    return " • ".join(descr_filtro) if descr_filtro else "Filtri: nessuno"
+
+def contesto() -> dict:
+    """Dati e filtri preparati dal punto di ingresso per la pagina in esecuzione."""
+    return st.session_state["contesto"]
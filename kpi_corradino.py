@@ -0,0 +1,80 @@
+# kpi_corradino.py
+# Calcolo dei KPI della vendemmia (senza Streamlit, così lo riuso anche fuori dalla dashboard)
+
+import numpy as np
+import pandas as pd
+
+def num_sicuro(df: pd.DataFrame, col: str) -> pd.Series:
+    """Converto una colonna in numerico senza far crashare tutto."""
+    return pd.to_numeric(df.get(col, pd.Series(dtype=float)), errors="coerce")
+
+def stima_litri(df: pd.DataFrame) -> pd.Series:
+    """Litri stimati = kg * resa (L/kg) * (1 - scarto)."""
+    kg = num_sicuro(df, "raccolto_kg").fillna(0)
+    resa = pd.to_numeric(df.get("resa_succo_L_kg", pd.Series(dtype=float)), errors="coerce").fillna(0.64)
+    scarto = pd.to_numeric(df.get("scarto_%", pd.Series(dtype=float)), errors="coerce").fillna(0.30)
+    return (kg * resa * (1 - scarto)).fillna(0)
+
+def calcola_kpi(df: pd.DataFrame) -> dict:
+    """KPI di sintesi sui dati (già filtrati): somme, medie, litri stimati ed efficienza L/€."""
+    costi = float(num_sicuro(df, "costo_totale_€").sum())
+    litri = float(stima_litri(df).sum())
+    return {
+        "raccolto_kg": float(num_sicuro(df, "raccolto_kg").sum()),
+        "brix_medio": float(num_sicuro(df, "grado_zuccherino_Brix").mean()),
+        "acidita_media_g_L": float(num_sicuro(df, "acidita_g_L").mean()),
+        "resa_media_L_kg": float(num_sicuro(df, "resa_succo_L_kg").mean()),
+        "ricavi_€": float(num_sicuro(df, "ricavo_€").sum()),
+        "costi_€": costi,
+        "margine_€": float(num_sicuro(df, "margine_€").sum()),
+        "litri_stimati": litri,
+        "efficienza_L_EUR": litri / (costi if (costi and not np.isnan(costi)) else 1.0),
+    }
+
+def righe_filtrate(df: pd.DataFrame, vigneti=None, vitigni=None, dal=None, al=None,
+                   irrigato: int | None = None) -> slice | np.ndarray:
+    """Posizioni (iloc) delle righe che passano i filtri della dashboard.
+
+    Con le righe ordinate per data l'intervallo diventa una fetta; gli altri filtri un'unica
+    maschera booleana, da cui tengo solo le posizioni selezionate (4 byte per riga). Se la
+    maschera non esclude niente ritorno direttamente la fetta.
+    """
+    inizio, fine = 0, len(df)
+    if (dal is not None or al is not None) and df["data"].is_monotonic_increasing:
+        if dal is not None: inizio = int(df["data"].searchsorted(pd.to_datetime(dal)))
+        if al is not None: fine = int(df["data"].searchsorted(pd.to_datetime(al), side="right"))
+        fine = max(inizio, fine)
+        dal = al = None
+    f = df.iloc[inizio:fine]
+
+    maschera = np.ones(len(f), dtype=bool)
+    if vigneti: maschera &= f["vigneto"].isin(vigneti).to_numpy()
+    if vitigni: maschera &= f["vitigno"].isin(vitigni).to_numpy()
+    if dal is not None: maschera &= (f["data"] >= pd.to_datetime(dal)).to_numpy()
+    if al is not None: maschera &= (f["data"] <= pd.to_datetime(al)).to_numpy()
+    if irrigato is not None and "irrigato" in f.columns:
+        maschera &= (f["irrigato"] == irrigato).to_numpy()
+    if maschera.all():
+        return slice(inizio, fine)
+    tipo = np.int32 if len(df) < 2**31 else np.int64
+    return (np.flatnonzero(maschera) + inizio).astype(tipo)
+
+def applica_filtri(df: pd.DataFrame, vigneti=None, vitigni=None, dal=None, al=None,
+                   irrigato: int | None = None) -> pd.DataFrame:
+    """Applico i filtri della dashboard (vigneti, vitigni, intervallo date, irrigazione).
+
+    Non copio i dati se non serve: se nessuna riga è esclusa ritorno una copia superficiale,
+    con il solo intervallo di date una fetta (vista sul dataset condiviso).
+    """
+    return prendi_righe(df, righe_filtrate(df, vigneti, vitigni, dal, al, irrigato))
+
+def prendi_righe(df: pd.DataFrame, righe: slice | np.ndarray) -> pd.DataFrame:
+    """DataFrame con le righe indicate da righe_filtrate.
+
+    Senza righe escluse non ritorno mai l'oggetto originale: aggiungere una colonna al
+    risultato cambierebbe anche il DataFrame condiviso. La copia superficiale (col
+    Copy-on-Write) non copia i dati.
+    """
+    if isinstance(righe, slice) and righe.start == 0 and righe.stop == len(df):
+        return df.copy(deep=False)
+    return df.iloc[righe]
@@ -0,0 +1,76 @@
+# misura_archivio.py
+# Misuro il caricamento di un archivio multi-stagione: dieci file letti in parallelo dovrebbero
+# costare circa quanto il file più grande, non dieci volte tanto.
+# Uso: python misura_archivio.py [--stagioni 10] [--righe 100000]
+#      -> esce con codice 1 se l'archivio in parallelo supera l'obiettivo (solo con più di una CPU)
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from archivio_corradino import MOTORE_CSV, carica_archivio
+
+# archivio in parallelo / file più grande: con 10 file e abbastanza core resto entro il doppio
+OBIETTIVO_RAPPORTO = 2.0
+
+def crea_archivio(cartella: Path, base: pd.DataFrame, stagioni: int, righe: int) -> list[Path]:
+    """Scrivo un CSV per stagione replicando i dati di base (date spostate sull'anno della stagione)."""
+    ripetizioni = int(np.ceil(righe / len(base)))
+    blocco = pd.concat([base] * ripetizioni, ignore_index=True).iloc[:righe]
+    file = []
+    for i in range(stagioni):
+        anno = 2016 + i
+        df = blocco.assign(data=blocco["data"].map(lambda d: d.replace(year=anno)))
+        percorso = cartella / f"vendemmia_{anno}.csv"
+        df.to_csv(percorso, index=False)
+        file.append(percorso)
+    return file
+
+def cronometra(funzione, ripetizioni: int = 3) -> float:
+    """Tempo migliore (s) su alcune ripetizioni, per togliere il rumore della cache del disco."""
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        funzione()
+        tempi.append(time.perf_counter() - t0)
+    return min(tempi)
+
+def misura(stagioni: int = 10, righe: int = 100_000, motori=("c", MOTORE_CSV)) -> list[dict]:
+    base = carica_archivio("dati_vendemmia_corradino.csv", "data")
+    risultati = []
+    with tempfile.TemporaryDirectory() as tmp:
+        file = crea_archivio(Path(tmp), base.drop(columns="stagione"), stagioni, righe)
+        for motore in dict.fromkeys(motori):
+            risultati.append({
+                "motore": motore,
+                "file_singolo_s": cronometra(lambda: carica_archivio(str(file[-1]), "data", motore=motore)),
+                "seriale_s": cronometra(lambda: carica_archivio(tmp, "data", max_thread=1, motore=motore)),
+                "parallelo_s": cronometra(lambda: carica_archivio(tmp, "data", motore=motore)),
+            })
+    return risultati
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempi di caricamento dell'archivio multi-stagione")
+    parser.add_argument("--stagioni", type=int, default=10)
+    parser.add_argument("--righe", type=int, default=100_000, help="righe per file di stagione")
+    args = parser.parse_args()
+
+    cpu = os.cpu_count() or 1
+    print(f"{args.stagioni} stagioni x {args.righe:,} righe – {cpu} CPU")
+    ok = True
+    for r in misura(args.stagioni, args.righe):
+        rapporto = r["parallelo_s"] / r["file_singolo_s"]
+        print(f"[{r['motore']}] file singolo {r['file_singolo_s']:.2f} s – seriale {r['seriale_s']:.2f} s – "
+              f"parallelo {r['parallelo_s']:.2f} s (x{rapporto:.1f} del file singolo, obiettivo x{OBIETTIVO_RAPPORTO:.1f})")
+        if r["motore"] == MOTORE_CSV:
+            ok = rapporto <= OBIETTIVO_RAPPORTO
+    if cpu < 2:
+        print("Con una sola CPU i thread non possono leggere in parallelo: obiettivo non verificato.")
+        ok = True
+    sys.exit(0 if ok else 1)
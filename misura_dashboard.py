@@ -0,0 +1,43 @@
+# misura_dashboard.py
+# Misuro avvio a freddo e tempo di rerun della dashboard (senza browser, con AppTest di Streamlit)
+# Uso: python misura_dashboard.py   -> esce con codice 1 se i tempi superano gli obiettivi
+
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+# obiettivi per la pagina KPI (quella che apre la maggior parte degli utenti);
+# lo script unico di prima misurava ~1.2–1.35 s di avvio e ~0.4–0.55 s per rerun: gli obiettivi
+# sono fissati sul miglioramento ottenuto, così lo script fallisce se si torna indietro
+OBIETTIVO_AVVIO_S = 0.90   # primo run: import + lettura CSV + pagina KPI
+OBIETTIVO_RERUN_S = 0.20   # rerun dopo il cambio di un filtro
+
+def misura(script: str = "dashboard_corradino.py", ripetizioni: int = 5) -> dict:
+    """Ritorno i tempi (s) di avvio a freddo e il rerun mediano dopo un cambio filtro."""
+    t0 = time.perf_counter()
+    at = AppTest.from_file(script, default_timeout=60).run()
+    avvio = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    tempi = []
+    scelte = ["Solo irrigate", "Tutte"]
+    for i in range(ripetizioni):
+        t0 = time.perf_counter()
+        at.sidebar.selectbox[0].select(scelte[i % 2]).run()
+        tempi.append(time.perf_counter() - t0)
+    tempi.sort()
+    return {
+        "avvio_s": avvio,
+        "rerun_s": tempi[len(tempi) // 2],
+        "reportlab_caricato": "reportlab" in sys.modules,
+    }
+
+if __name__ == "__main__":
+    r = misura()
+    print(f"Avvio a freddo: {r['avvio_s']:.2f} s (obiettivo {OBIETTIVO_AVVIO_S:.2f} s)")
+    print(f"Rerun mediano:  {r['rerun_s']:.3f} s (obiettivo {OBIETTIVO_RERUN_S:.3f} s)")
+    print(f"reportlab caricato: {'sì' if r['reportlab_caricato'] else 'no'}")
+    ok = r["avvio_s"] <= OBIETTIVO_AVVIO_S and r["rerun_s"] <= OBIETTIVO_RERUN_S and not r["reportlab_caricato"]
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,75 @@
+# pagine/esporta.py
+# Esportazione dei dati filtrati (CSV) e del report PDF
+#
+# Qui non tengo le righe filtrate in variabili della pagina: pulsanti di download e frammento
+# del PDF restano vivi tra un rerun e l'altro e le tratterrebbero per tutta la sessione.
+# Mi porto dietro solo i filtri e rifaccio le righe al clic (filtri["ricarica"]).
+
+from functools import partial
+
+import streamlit as st
+
+from comune_corradino import contesto, csv_in_byte, riassunto_filtri
+
+filtri, df_l = contesto()["filtri"], contesto()["df_l"]
+
+# -------------------------
+# export CSV + PDF
+# -------------------------
+st.header("Esporta (CSV)")
+colX, colY = st.columns(2)
+colX.download_button(
+    "Scarica vendemmia filtrata (CSV)",
+    data=partial(csv_in_byte, filtri["ricarica"]),
+    file_name="vendemmia_filtrata_corradino.csv",
+    mime="text/csv",
+    on_click="ignore"
+)
+if df_l is not None and not df_l.empty:
+    colY.download_button(
+        "Scarica lotti (CSV)",
+        data=partial(csv_in_byte, df_l),
+        file_name="lotti_fermentazione_corradino.csv",
+        mime="text/csv",
+        on_click="ignore"
+    )
+
+st.markdown("---")
+st.header("Esporta Report PDF")
+
+# riassunto filtri correnti (così il PDF è leggibile anche da chi non vede la pagina)
+riassunto = riassunto_filtri(filtri)
+
+@st.fragment
+def sezione_pdf():
+    """Il pulsante del PDF riesegue solo questo frammento, non tutta la pagina."""
+    col_gen, col_info = st.columns([1, 2])
+    with col_gen:
+        genera_pdf = st.button("Genera Report PDF", type="primary")
+    with col_info:
+        st.write("Creo un PDF con KPI e 2–3 grafici principali relativi ai filtri attuali.")
+
+    if genera_pdf:
+        try:
+            # reportlab/kaleido li carico solo adesso: chi non esporta non li paga all'avvio
+            from report_corradino import build_pdf_report
+
+            pdf_bytes = build_pdf_report(
+                df_filtrato=filtri["ricarica"](),
+                df_lotti=df_l,
+                titolo="Cantina Corradino – Report Vendemmia",
+                sottotitolo=riassunto
+            )
+            st.success("Report generato.")
+            st.download_button(
+                label="Scarica Report PDF",
+                data=pdf_bytes,
+                file_name="report_vendemmia_corradino.pdf",
+                mime="application/pdf",
+                on_click="ignore"
+            )
+        except Exception as e:
+            st.error("Errore nella generazione del PDF. Controllo che 'reportlab' e 'kaleido' siano installati nel venv.")
+            st.exception(e)
+
+sezione_pdf()
@@ -0,0 +1,82 @@
+# pagine/lotti_efficienza.py
+# Lotti di fermentazione ed efficienza (L/€) per irrigazione e per vigneto
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from comune_corradino import contesto
+from kpi_corradino import num_sicuro, stima_litri
+
+ctx = contesto()
+f, df_l, filtri = ctx["f"], ctx["df_l"], ctx["filtri"]
+sel_vigneti, sel_vitigni = filtri["vigneti"], filtri["vitigni"]
+
+# -------------------------
+# lotti di fermentazione 
+# -------------------------
+st.header("Lotti di fermentazione")
+if df_l is not None and not df_l.empty:
+    lf = df_l
+    if "vigneto" in lf.columns and sel_vigneti:
+        lf = lf[lf["vigneto"].isin(sel_vigneti)]
+    if "vitigno" in lf.columns and sel_vitigni:
+        lf = lf[lf["vitigno"].isin(sel_vitigni)]
+
+    colE, colF, colG = st.columns(3)
+    uva_lotti = num_sicuro(lf, "uva_input_kg").sum()
+    litri_lotti = num_sicuro(lf, "resa_L").sum()
+    t_media_ferm = num_sicuro(lf, "temp_media_ferment_C").mean()
+
+    colE.metric("Uva nei lotti (kg)", f"{uva_lotti:,.0f}".replace(",", "."))
+    colF.metric("Litri prodotti (lotti)", f"{litri_lotti:,.0f}".replace(",", "."))
+    colG.metric("T media ferment. (°C)", f"{t_media_ferm:,.1f}".replace(",", "."))
+
+    st.subheader("Tabella lotti (filtrata)")
+    st.dataframe(lf, use_container_width=True)
+
+    if {"vigneto", "resa_L"}.issubset(lf.columns):
+        agg_lotti = lf.groupby("vigneto", as_index=False, observed=True)["resa_L"].sum().sort_values("resa_L", ascending=False)
+        st.plotly_chart(px.bar(agg_lotti, x="vigneto", y="resa_L", title="Produzione (L) per vigneto – Lotti"),
+                        use_container_width=True)
+else:
+    st.info("Se carico il file 'lotti_fermentazione_corradino.csv', qui vedo anche i lotti.")
+
+st.markdown("---")
+
+# -------------------------
+# efficienza per irrigazione e per vigneto
+# -------------------------
+st.subheader("Confronto irrigazione – Efficienza (L/€)")
+if "irrigato" in f.columns:
+    df_eff = pd.DataFrame({"irrigato": f["irrigato"], "_litri": stima_litri(f),
+                           "_costi": num_sicuro(f, "costo_totale_€")})
+    grp = df_eff.groupby("irrigato", as_index=False).agg({"_litri": "sum", "_costi": "sum"})
+    grp["efficienza_L_EUR"] = grp.apply(lambda r: r["_litri"] / (r["_costi"] if r["_costi"] else np.nan), axis=1)
+    grp["stato_irrigazione"] = grp["irrigato"].map({1: "Irrigato", 0: "Non irrigato"}).fillna("N/D")
+
+    st.plotly_chart(
+        px.bar(grp, x="stato_irrigazione", y="efficienza_L_EUR",
+               title="Efficienza per stato di irrigazione (L/€)", text_auto=".2f"),
+        use_container_width=True
+    )
+else:
+    st.info("Colonna 'irrigato' non presente nei dati.")
+
+st.subheader("Efficienza per vigneto (L/€)")
+if "vigneto" in f.columns:
+    df_vig = pd.DataFrame({"vigneto": f["vigneto"], "_litri": stima_litri(f),
+                           "_costi": num_sicuro(f, "costo_totale_€")})
+    gv = df_vig.groupby("vigneto", as_index=False, observed=True).agg({"_litri": "sum", "_costi": "sum"})
+    gv = gv[gv["_costi"] > 0]
+    gv["efficienza_L_EUR"] = gv["_litri"] / gv["_costi"]
+    gv = gv.sort_values("efficienza_L_EUR", ascending=False)
+
+    st.plotly_chart(
+        px.bar(gv, x="vigneto", y="efficienza_L_EUR",
+               title="Efficienza per vigneto (L/€)", text_auto=".2f"),
+        use_container_width=True
+    )
+else:
+    st.info("Colonna 'vigneto' non presente.")
@@ -0,0 +1,70 @@
+# pagine/panoramica.py
+# Pagina iniziale: KPI di sintesi, andamento giornaliero e distribuzioni
+
+import plotly.express as px
+import streamlit as st
+
+from comune_corradino import contesto
+from kpi_corradino import calcola_kpi
+
+f = contesto()["f"]
+
+# -------------------------
+# KPI
+# -------------------------
+st.subheader("KPI di sintesi")
+
+c1, c2, c3, c4, c5, c6, c7 = st.columns(7)
+
+kpi = calcola_kpi(f)
+
+c1.metric("Raccolto (kg)", f"{kpi['raccolto_kg']:,.0f}".replace(",", "."))
+c2.metric("°Brix medio", f"{kpi['brix_medio']:,.1f}".replace(",", "."))
+c3.metric("Acidità media (g/L)", f"{kpi['acidita_media_g_L']:,.2f}".replace(",", "."))
+c4.metric("Resa media (L/kg)", f"{kpi['resa_media_L_kg']:,.3f}".replace(",", "."))
+c5.metric("Ricavi totali (€)", f"{kpi['ricavi_€']:,.0f}".replace(",", "."))
+c6.metric("Costi totali (€)", f"{kpi['costi_€']:,.0f}".replace(",", "."))
+c7.metric("Margine totale (€)", f"{kpi['margine_€']:,.0f}".replace(",", "."))
+
+# KPI extra (litri + efficienza)
+k1, k2 = st.columns(2)
+k1.metric("Litri prodotti (stima)", f"{kpi['litri_stimati']:,.0f}".replace(",", "."))
+k2.metric("Efficienza (L/€)", f"{kpi['efficienza_L_EUR']:,.2f}".replace(",", "."), help="Litri stimati / costo totale")
+
+st.markdown("---")
+
+# -------------------------
+# grafici principali
+# -------------------------
+st.subheader("Andamento giornaliero")
+colA, colB = st.columns(2)
+
+with colA:
+    if {"data", "raccolto_kg"}.issubset(f.columns):
+        g = f.groupby("data", as_index=False)["raccolto_kg"].sum()
+        st.plotly_chart(px.line(g, x="data", y="raccolto_kg", title="Raccolto giornaliero (kg)"), use_container_width=True)
+    else:
+        st.info("Mancano colonne 'data' o 'raccolto_kg'.")
+
+with colB:
+    if {"data", "temperatura_C"}.issubset(f.columns):
+        g2 = f.groupby("data", as_index=False)["temperatura_C"].mean()
+        st.plotly_chart(px.line(g2, x="data", y="temperatura_C", title="Temperatura media giornaliera (°C)"), use_container_width=True)
+    else:
+        st.info("Mancano colonne 'data' o 'temperatura_C'.")
+
+st.subheader("Distribuzioni")
+colC, colD = st.columns(2)
+with colC:
+    if {"vigneto", "raccolto_kg"}.issubset(f.columns):
+        g3 = f.groupby("vigneto", as_index=False, observed=True)["raccolto_kg"].sum().sort_values("raccolto_kg", ascending=False)
+        st.plotly_chart(px.bar(g3, x="vigneto", y="raccolto_kg", title="Raccolto per vigneto (kg)"), use_container_width=True)
+    else:
+        st.info("Mancano colonne 'vigneto' o 'raccolto_kg'.")
+
+with colD:
+    if {"vitigno", "raccolto_kg"}.issubset(f.columns):
+        g4 = f.groupby("vitigno", as_index=False, observed=True)["raccolto_kg"].sum().sort_values("raccolto_kg", ascending=False)
+        st.plotly_chart(px.bar(g4, x="vitigno", y="raccolto_kg", title="Raccolto per vitigno (kg)"), use_container_width=True)
+    else:
+        st.info("Mancano colonne 'vitigno' o 'raccolto_kg'.")
@@ -0,0 +1,95 @@
+# pagine/qualita.py
+# Qualità delle uve: °Brix vs Acidità e confronto per stato di irrigazione
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from comune_corradino import box_da_quantili, contesto, scatter_adattivo
+from kpi_corradino import num_sicuro
+
+f = contesto()["f"]
+
+st.subheader("Qualità: °Brix vs Acidità")
+if {"grado_zuccherino_Brix", "acidita_g_L"}.issubset(f.columns):
+    # prendo solo le colonne del grafico: il dataset condiviso non viene copiato
+    q = pd.DataFrame({
+        "grado_zuccherino_Brix": num_sicuro(f, "grado_zuccherino_Brix"),
+        "acidita_g_L": num_sicuro(f, "acidita_g_L"),
+        "vitigno": f["vitigno"],
+        "vigneto": f["vigneto"],
+    }).dropna(subset=["grado_zuccherino_Brix", "acidita_g_L"])
+    if not q.empty:
+        st.plotly_chart(
+            scatter_adattivo(
+                q, x="grado_zuccherino_Brix", y="acidita_g_L",
+                titolo="Relazione °Brix – Acidità (per vitigno, faccette per vigneto)",
+                color="vitigno", facet_col="vigneto", facet_col_wrap=2
+            ),
+            use_container_width=True
+        )
+    else:
+        st.info("Dati insufficienti per il grafico °Brix–Acidità con i filtri attuali.")
+else:
+    st.info("Mancano le colonne per il grafico °Brix–Acidità.")
+
+st.subheader("Qualità per irrigazione – °Brix e Acidità")
+dfq = pd.DataFrame({
+    "grado_zuccherino_Brix": num_sicuro(f, "grado_zuccherino_Brix"),
+    "acidita_g_L": num_sicuro(f, "acidita_g_L"),
+}, index=f.index)
+if "irrigato" in f.columns:
+    dfq["irrigato"] = f["irrigato"]
+dfq = dfq.dropna(subset=["grado_zuccherino_Brix", "acidita_g_L"], how="all")
+
+if "irrigato" in dfq.columns and not dfq.empty:
+    agg = dfq.groupby("irrigato", as_index=False).agg(
+        brix_m=("grado_zuccherino_Brix", "mean"),
+        acid_m=("acidita_g_L", "mean"),
+        n_misure=("grado_zuccherino_Brix", "count")
+    )
+    agg["stato_irrigazione"] = agg["irrigato"].map({1: "Irrigato", 0: "Non irrigato"}).fillna("N/D")
+
+    st.write("**Medie per stato di irrigazione**")
+    st.dataframe(
+        agg[["stato_irrigazione", "brix_m", "acid_m", "n_misure"]]
+          .rename(columns={"brix_m": "°Brix medio", "acid_m": "Acidità media (g/L)", "n_misure": "N° misure"}),
+        use_container_width=True
+    )
+
+    agg_melt = agg.melt(
+        id_vars=["stato_irrigazione"],
+        value_vars=["brix_m", "acid_m"],
+        var_name="Metrica", value_name="Valore"
+    )
+    agg_melt["Metrica"] = agg_melt["Metrica"].map({"brix_m": "°Brix medio", "acid_m": "Acidità media (g/L)"})
+
+    st.plotly_chart(
+        px.bar(agg_melt, x="stato_irrigazione", y="Valore", color="Metrica",
+               barmode="group", text_auto=".2f",
+               title="Confronto medie di qualità per irrigazione"),
+        use_container_width=True
+    )
+
+    col_q1, col_q2 = st.columns(2)
+    with col_q1:
+        if dfq["grado_zuccherino_Brix"].notna().any():
+            dfq["Stato irrigazione"] = dfq["irrigato"].map({1: "Irrigato", 0: "Non irrigato"})
+            st.plotly_chart(
+                box_da_quantili(dfq, x="Stato irrigazione", y="grado_zuccherino_Brix",
+                                titolo="Distribuzione °Brix per irrigazione"),
+                use_container_width=True
+            )
+        else:
+            st.info("Nessuna misura disponibile per °Brix con i filtri correnti.")
+    with col_q2:
+        if dfq["acidita_g_L"].notna().any():
+            st.plotly_chart(
+                box_da_quantili(dfq, x="Stato irrigazione", y="acidita_g_L",
+                                titolo="Distribuzione Acidità (g/L) per irrigazione"),
+                use_container_width=True
+            )
+        else:
+            st.info("Nessuna misura disponibile per Acidità con i filtri correnti.")
+else:
+    st.info("Dati qualità non sufficienti o colonna 'irrigato' assente.")
@@ -0,0 +1,65 @@
+# pagine/stagioni.py
+# Confronto tra stagioni: KPI anno su anno e curve di raccolto giornaliero sovrapposte
+
+import plotly.express as px
+import streamlit as st
+
+from archivio_corradino import aggregati_stagione, curve_giornaliere
+from comune_corradino import contesto
+
+f = contesto()["f"]
+
+st.header("Confronto tra stagioni")
+if "stagione" not in f.columns or f["stagione"].nunique() < 2:
+    st.info("Per confrontare le annate servono dati di almeno due stagioni (con i filtri correnti): "
+            "un CSV con più annate, oppure una cartella o un glob con un CSV per stagione.")
+else:
+    # -------------------------
+    # KPI per stagione
+    # -------------------------
+    agg = aggregati_stagione(f)
+    agg["stagione"] = agg["stagione"].astype(str)
+
+    st.subheader("KPI per stagione (filtri correnti)")
+    st.dataframe(
+        agg.rename(columns={
+            "stagione": "Stagione", "raccolto_kg": "Raccolto (kg)", "brix_medio": "°Brix medio",
+            "acidita_media_g_L": "Acidità media (g/L)", "resa_media_L_kg": "Resa media (L/kg)",
+            "ricavi_€": "Ricavi (€)", "costi_€": "Costi (€)", "margine_€": "Margine (€)",
+            "litri_stimati": "Litri (stima)", "efficienza_L_EUR": "Efficienza (L/€)"
+        }),
+        use_container_width=True
+    )
+
+    colA, colB = st.columns(2)
+    with colA:
+        st.plotly_chart(px.bar(agg, x="stagione", y="raccolto_kg", title="Raccolto per stagione (kg)"),
+                        use_container_width=True)
+    with colB:
+        st.plotly_chart(px.bar(agg, x="stagione", y="efficienza_L_EUR", text_auto=".2f",
+                               title="Efficienza per stagione (L/€)"),
+                        use_container_width=True)
+
+    colC, colD = st.columns(2)
+    with colC:
+        st.plotly_chart(px.line(agg, x="stagione", y="brix_medio", markers=True, title="°Brix medio per stagione"),
+                        use_container_width=True)
+    with colD:
+        st.plotly_chart(px.bar(agg, x="stagione", y="margine_€", title="Margine per stagione (€)"),
+                        use_container_width=True)
+
+    # -------------------------
+    # curve giornaliere sovrapposte
+    # -------------------------
+    st.subheader("Raccolto giornaliero – stagioni sovrapposte")
+    curve = curve_giornaliere(f)
+    curve["stagione"] = curve["stagione"].astype(str)
+    colE, colF = st.columns(2)
+    with colE:
+        st.plotly_chart(px.line(curve, x="giorno_vendemmia", y="raccolto_kg", color="stagione",
+                                title="Raccolto giornaliero (kg) per giorno di vendemmia"),
+                        use_container_width=True)
+    with colF:
+        st.plotly_chart(px.line(curve, x="giorno_vendemmia", y="raccolto_cumulato_kg", color="stagione",
+                                title="Raccolto cumulato (kg) per giorno di vendemmia"),
+                        use_container_width=True)
@@ -0,0 +1,247 @@
+# report_corradino.py
+# Report PDF della vendemmia (KPI, grafici, lotti, note metodologiche)
+# Lo importo solo quando l'utente chiede il PDF: reportlab e kaleido pesano all'avvio.
+
+import io
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from kpi_corradino import stima_litri
+
+def fig_to_png_bytes(fig) -> bytes:
+    """Esporto una figura Plotly come PNG (serve 'kaleido' nel venv)."""
+    return fig.to_image(format="png", scale=2)
+
+def crea_grafici_report(df_filtrato: pd.DataFrame):
+    """Preparo alcuni grafici base da mettere nel PDF (in base ai dati filtrati)."""
+    grafici = []
+
+    if {"data", "raccolto_kg"}.issubset(df_filtrato.columns) and not df_filtrato.empty:
+        g = df_filtrato.groupby("data", as_index=False)["raccolto_kg"].sum()
+        grafici.append(("Raccolto giornaliero (kg)", px.line(g, x="data", y="raccolto_kg")))
+
+    if {"data", "temperatura_C"}.issubset(df_filtrato.columns) and not df_filtrato.empty:
+        g2 = df_filtrato.groupby("data", as_index=False)["temperatura_C"].mean()
+        grafici.append(("Temperatura media giornaliera (°C)", px.line(g2, x="data", y="temperatura_C")))
+
+    if {"vigneto", "raccolto_kg"}.issubset(df_filtrato.columns) and not df_filtrato.empty:
+        g3 = (df_filtrato.groupby("vigneto", as_index=False, observed=True)["raccolto_kg"]
+              .sum().sort_values("raccolto_kg", ascending=False))
+        grafici.append(("Raccolto per vigneto (kg)", px.bar(g3, x="vigneto", y="raccolto_kg")))
+
+    return grafici
+
+def scrivi_paragrafo(canvas_obj, testo: str, x: float, y: float, max_larghezza: float,
+                     font="Helvetica", size=10, leading=12) -> float:
+    """Scrivo un paragrafo con a capo automatico; ritorno la nuova y."""
+    canvas_obj.setFont(font, size)
+    parole = testo.split()
+    riga = ""
+    for p in parole:
+        prova = (riga + " " + p).strip()
+        if canvas_obj.stringWidth(prova, font, size) <= max_larghezza:
+            riga = prova
+        else:
+            canvas_obj.drawString(x, y, riga)
+            y -= leading
+            riga = p
+    if riga:
+        canvas_obj.drawString(x, y, riga)
+        y -= leading
+    return y
+
+def build_pdf_report(df_filtrato: pd.DataFrame, df_lotti: pd.DataFrame | None,
+                     titolo: str, sottotitolo: str) -> bytes:
+    """Genero il PDF del report (KPI, grafici, lotti, note metodologiche)."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    W, H = A4
+    margin = 1.5 * cm
+    y = H - margin
+
+    # intestazione
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(margin, y, titolo)
+    y -= 14
+    c.setFont("Helvetica", 10)
+    c.drawString(margin, y, sottotitolo)
+    y -= 18
+
+    # KPI helper
+    def mmedia(s):
+        s = pd.to_numeric(s, errors="coerce")
+        return float(s.mean()) if len(s) else float("nan")
+    def somma(s):
+        s = pd.to_numeric(s, errors="coerce")
+        return float(s.sum()) if len(s) else 0.0
+
+    # KPI
+    raccolto = somma(df_filtrato.get("raccolto_kg", []))
+    brix_m   = mmedia(df_filtrato.get("grado_zuccherino_Brix", []))
+    acid_m   = mmedia(df_filtrato.get("acidita_g_L", []))
+    resa_m   = mmedia(df_filtrato.get("resa_succo_L_kg", []))
+    ricavi   = somma(df_filtrato.get("ricavo_€", []))
+    costi    = somma(df_filtrato.get("costo_totale_€", []))
+    margine  = somma(df_filtrato.get("margine_€", []))
+    litri    = float(stima_litri(df_filtrato).sum())
+    eff      = litri / (costi if costi else 1.0)
+
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(margin, y, "KPI di sintesi (filtri correnti)")
+    y -= 12
+    c.setFont("Helvetica", 10)
+    righe = [
+        f"Raccolto: {raccolto:,.0f} kg",
+        f"°Brix medio: {brix_m:,.1f}" if not np.isnan(brix_m) else "°Brix medio: n/d",
+        f"Acidità media: {acid_m:,.2f} g/L" if not np.isnan(acid_m) else "Acidità media: n/d",
+        f"Resa media: {resa_m:,.3f} L/kg" if not np.isnan(resa_m) else "Resa media: n/d",
+        f"Ricavi totali: € {ricavi:,.0f}",
+        f"Costi totali: € {costi:,.0f}",
+        f"Margine totale: € {margine:,.0f}",
+        f"Litri prodotti (stima): {litri:,.0f} L",
+        f"Efficienza: {eff:,.2f} L/€"
+    ]
+    for r in righe:
+        c.drawString(margin, y, r.replace(",", "."))
+        y -= 12
+
+    # Grafici principali
+    grafici = crea_grafici_report(df_filtrato)
+    for titolo_fig, fig in grafici:
+        png = fig_to_png_bytes(fig)
+        img = ImageReader(io.BytesIO(png))
+
+        img_w = W - 2 * margin
+        img_h = 7 * cm
+
+        # se lo spazio residuo non basta, nuova pagina
+        if y < img_h + 3 * cm:
+            c.showPage()
+            y = H - margin
+
+        # titolo grafico
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(margin, y, titolo_fig)
+        y -= 8
+
+        # immagine
+        c.drawImage(img, margin, y - img_h, width=img_w, height=img_h)
+        y -= (img_h + 12)
+
+    # Lotti (se presenti)
+    if df_lotti is not None and not df_lotti.empty:
+        if y < 4 * cm:
+            c.showPage()
+            y = H - margin
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(margin, y, "Sintesi lotti di fermentazione")
+        y -= 12
+        try:
+            uva_lotti = pd.to_numeric(df_lotti.get("uva_input_kg", pd.Series(dtype=float)), errors="coerce").sum()
+            litri_lotti = pd.to_numeric(df_lotti.get("resa_L", pd.Series(dtype=float)), errors="coerce").sum()
+            c.setFont("Helvetica", 10)
+            c.drawString(margin, y, f"Uva nei lotti: {uva_lotti:,.0f} kg".replace(",", "."))
+            y -= 12
+            c.drawString(margin, y, f"Litri prodotti (lotti): {litri_lotti:,.0f} L".replace(",", "."))
+            y -= 16
+        except Exception:
+            pass
+
+    # Pagina finale: Note metodologiche 
+    c.showPage()
+    W, H = A4
+    margin = 1.5 * cm
+    y = H - margin
+
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(margin, y, "Note metodologiche")
+    y -= 18
+
+    # 1) Contesto e obiettivo
+    y = scrivi_paragrafo(
+        c,
+        "Contesto. Ho costruito una piccola pipeline per analizzare il periodo di vendemmia della Cantina Corradino: "
+        "i dati vengono simulati (privacy/tempi) e poi letti in una dashboard per il monitoraggio. "
+        "L’obiettivo è visualizzare in modo chiaro i principali indicatori tecnici ed economici.",
+        margin, y, W - 2*margin, size=10
+    )
+
+    # 2) Dati e struttura
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(margin, y, "Dati utilizzati")
+    y -= 14
+    y = scrivi_paragrafo(
+        c,
+        "- Vendemmia (CSV): data, vigneto, vitigno, raccolto, °Brix, acidità, costi e margini. "
+        "- Lotti (CSV opzionale): resa in litri e temperatura media di fermentazione.",
+        margin, y, W - 2*margin
+    )
+
+    # 3) Ipotesi adottate
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(margin, y, "Ipotesi di lavoro")
+    y -= 14
+    y = scrivi_paragrafo(
+        c,
+        "- Dati simulati, calibrati sull’intervista alla cantina (Sicilia occidentale, altitudini ~0–600 m, "
+        "vendemmia fine agosto–metà ottobre, scarto medio 25–35%, irrigazione ~70%). "
+        "- Le grandezze economiche sono indicative, utili per confronti relativi.",
+        margin, y, W - 2*margin
+    )
+
+    # 4) KPI e formule
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(margin, y, "KPI e formule principali")
+    y -= 14
+    y = scrivi_paragrafo(
+        c,
+        "• Litri prodotti (stima) = kg_raccolti × resa_L/kg × (1 − scarto)  "
+        "• Efficienza (L/€) = litri_prodotti / costo_totale  "
+        "• Margine (€) = ricavi − costi  "
+        "• °Brix e Acidità: medie aritmetiche sui dati filtrati.",
+        margin, y, W - 2*margin
+    )
+
+    # 5) Limiti
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(margin, y, "Limiti dell’analisi")
+    y -= 14
+    y = scrivi_paragrafo(
+        c,
+        "- I risultati sono indicazioni qualitative: molte variabili (gestione in campo, pratiche di cantina) non sono modellate. "
+        "Con filtri molto stretti le medie possono essere poco rappresentative.",
+        margin, y, W - 2*margin
+    )
+
+    # 6) Riproducibilità
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(margin, y, "Riproducibilità")
+    y -= 14
+    y = scrivi_paragrafo(
+        c,
+        "Per rifare l’analisi: (1) attivo il venv; (2) eseguo il simulatore per generare i CSV; "
+        "(3) avvio la dashboard; (4) imposto i filtri; (5) esporto il PDF. "
+        "Dipendenze: Python 3.x, pandas, numpy, streamlit, plotly, reportlab, kaleido.",
+        margin, y, W - 2*margin
+    )
+
+    # 7) Footer con timestamp e riferimenti sintetici
+    c.setFont("Helvetica", 9)
+    c.drawString(margin, y, "Riferimenti: Documentazione Streamlit/Plotly; Appunti L31 (Pegaso); Intervista Cantina Corradino (2025).")
+    y -= 12
+    c.setFont("Helvetica-Oblique", 8)
+    c.drawString(margin, y, f"Report generato il: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+
+    # chiusura
+    c.showPage()
+    c.save()
+    buffer.seek(0)
+    return buffer.getvalue()
@@ -0,0 +1,356 @@
+# servizio_kpi_corradino.py
+# Servizio HTTP/JSON locale con gli stessi KPI della dashboard (raccolto, °Brix, margine, efficienza L/€...)
+# Il dataset resta in memoria, le risposte finiscono in una cache LRU con ETag e le richieste
+# vengono servite da un pool di thread.
+#
+# Avvio:        python servizio_kpi_corradino.py --dati dati_vendemmia_corradino.csv --porta 8765
+# Esempio:      GET /kpi?vigneto=Favara&vitigno=Syrah&dal=2025-09-01&al=2025-09-30&irrigato=1&per=vitigno
+# Prova carico: python servizio_kpi_corradino.py --prova-carico 2000
+
+import argparse
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+import numpy as np
+import pandas as pd
+
+from archivio_corradino import carica_archivio
+from kpi_corradino import applica_filtri, calcola_kpi
+
+RAGGRUPPAMENTI = ("vigneto", "vitigno", "stagione", "irrigato")
+
+# ==============================
+# CACHE DELLE RISPOSTE
+# ==============================
+
+class CacheLRU:
+    """Cache LRU thread-safe: chiave -> (etag, corpo JSON)."""
+
+    def __init__(self, capacita: int = 256):
+        self.capacita = capacita
+        self._dati = OrderedDict()
+        self._lock = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+
+    def get(self, chiave):
+        with self._lock:
+            valore = self._dati.get(chiave)
+            if valore is None:
+                self.miss += 1
+                return None
+            self._dati.move_to_end(chiave)
+            self.hit += 1
+            return valore
+
+    def put(self, chiave, valore):
+        with self._lock:
+            self._dati[chiave] = valore
+            self._dati.move_to_end(chiave)
+            while len(self._dati) > self.capacita:
+                self._dati.popitem(last=False)
+
+    def svuota(self):
+        with self._lock:
+            self._dati.clear()
+            self.hit = 0
+            self.miss = 0
+
+# ==============================
+# LOGICA DEL SERVIZIO
+# ==============================
+
+def _pulisci(valore):
+    """JSON non accetta NaN: li trasformo in null."""
+    if isinstance(valore, float) and math.isnan(valore):
+        return None
+    return valore
+
+def _lista(parametri: dict, nome: str) -> list[str]:
+    """Parametri ripetuti o separati da virgola (vigneto=A,B oppure vigneto=A&vigneto=B)."""
+    valori = []
+    for v in parametri.get(nome, []):
+        valori.extend(x.strip() for x in v.split(",") if x.strip())
+    return sorted(set(valori))
+
+def _data(parametri: dict, nome: str) -> date | None:
+    """Data in formato ISO (AAAA-MM-GG); se non è valida rispondo 400 invece di far cadere la connessione."""
+    valore = parametri.get(nome, [""])[0].strip()
+    if not valore:
+        return None
+    try:
+        return date.fromisoformat(valore)
+    except ValueError:
+        raise ValueError(f"{nome} deve essere una data AAAA-MM-GG, non {valore!r}") from None
+
+def _json(stato: int, dati: dict) -> tuple[int, dict, bytes]:
+    return stato, {"Content-Type": "application/json"}, json.dumps(dati, ensure_ascii=False).encode("utf-8")
+
+class ServizioKPI:
+    """Tiene il dataset in memoria e calcola i KPI a partire dai parametri della query."""
+
+    def __init__(self, df: pd.DataFrame, capacita_cache: int = 256):
+        self.df = df.sort_values("data").reset_index(drop=True)
+        self.cache = CacheLRU(capacita_cache)
+
+    def normalizza(self, query: str) -> tuple:
+        """Chiave di cache: stessi filtri in ordine diverso -> stessa chiave."""
+        p = parse_qs(query)
+        irrigato = p.get("irrigato", [""])[0]
+        per = p.get("per", [""])[0]
+        if irrigato not in ("", "0", "1"):
+            raise ValueError("irrigato deve essere 0 o 1")
+        if per and per not in RAGGRUPPAMENTI:
+            raise ValueError(f"per deve essere uno tra: {', '.join(RAGGRUPPAMENTI)}")
+        dal, al = _data(p, "dal"), _data(p, "al")
+        if dal and al and dal > al:
+            raise ValueError("dal deve precedere al")
+        return (
+            ("vigneto", tuple(_lista(p, "vigneto"))),
+            ("vitigno", tuple(_lista(p, "vitigno"))),
+            ("dal", dal),
+            ("al", al),
+            ("irrigato", irrigato),
+            ("per", per),
+        )
+
+    def calcola(self, chiave: tuple) -> dict:
+        """Filtro il dataset e calcolo i KPI (totali ed eventualmente per gruppo)."""
+        filtri = dict(chiave)
+        f = applica_filtri(
+            self.df,
+            vigneti=list(filtri["vigneto"]),
+            vitigni=list(filtri["vitigno"]),
+            dal=filtri["dal"],
+            al=filtri["al"],
+            irrigato=int(filtri["irrigato"]) if filtri["irrigato"] else None,
+        )
+        risposta = {
+            "filtri": {k: list(v) if isinstance(v, tuple) else (v.isoformat() if isinstance(v, date) else v)
+                       for k, v in filtri.items()},
+            "righe": int(len(f)),
+            "kpi": {k: _pulisci(v) for k, v in calcola_kpi(f).items()},
+        }
+        per = filtri["per"]
+        if per and per in f.columns:
+            risposta["gruppi"] = [
+                {per: _pulisci(g.item() if hasattr(g, "item") else g),
+                 **{k: _pulisci(v) for k, v in calcola_kpi(sotto).items()}}
+                for g, sotto in f.groupby(per, observed=True)
+            ]
+        return risposta
+
+    def rispondi(self, query: str, if_none_match: str | None = None) -> tuple[int, dict, bytes]:
+        """Gestisco una richiesta /kpi: ritorno (stato HTTP, header, corpo)."""
+        try:
+            chiave = self.normalizza(query)
+        except ValueError as e:
+            return _json(400, {"errore": str(e)})
+
+        in_cache = self.cache.get(chiave)
+        if in_cache is None:
+            try:
+                corpo = json.dumps(self.calcola(chiave), ensure_ascii=False, default=str).encode("utf-8")
+            except Exception as e:
+                return _json(500, {"errore": f"errore interno: {type(e).__name__}"})
+            etag = '"' + hashlib.sha1(corpo).hexdigest()[:20] + '"'
+            in_cache = (etag, corpo)
+            self.cache.put(chiave, in_cache)
+        etag, corpo = in_cache
+
+        intestazioni = {"ETag": etag, "Cache-Control": "max-age=60"}
+        if if_none_match and etag in [x.strip() for x in if_none_match.split(",")]:
+            return 304, intestazioni, b""
+        intestazioni["Content-Type"] = "application/json; charset=utf-8"
+        return 200, intestazioni, corpo
+
+    def salute(self) -> dict:
+        return {"stato": "ok", "righe": int(len(self.df)),
+                "cache_hit": self.cache.hit, "cache_miss": self.cache.miss}
+
+# ==============================
+# SERVER HTTP CON POOL DI WORKER
+# ==============================
+
+class GestoreKPI(BaseHTTPRequestHandler):
+    servizio: ServizioKPI = None  # impostato da crea_server
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            if url.path == "/kpi":
+                stato, intestazioni, corpo = self.servizio.rispondi(url.query, self.headers.get("If-None-Match"))
+            elif url.path == "/salute":
+                stato, intestazioni, corpo = _json(200, self.servizio.salute())
+            else:
+                stato, intestazioni, corpo = _json(404, {"errore": "percorso non trovato"})
+        except Exception as e:
+            # qualunque errore imprevisto diventa un 500 JSON: il client riceve sempre uno stato
+            stato, intestazioni, corpo = _json(500, {"errore": f"errore interno: {type(e).__name__}"})
+
+        self.send_response(stato)
+        for k, v in intestazioni.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if corpo:
+            self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        pass  # niente log per ogni richiesta: rallenta le prove di carico
+
+class ServerConPool(HTTPServer):
+    """HTTPServer che passa ogni connessione a un pool di thread di dimensione fissa."""
+
+    def __init__(self, indirizzo, gestore, n_worker: int = 8):
+        super().__init__(indirizzo, gestore)
+        self.pool = ThreadPoolExecutor(max_workers=n_worker, thread_name_prefix="kpi")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._servi, request, client_address)
+
+    def _servi(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+def crea_server(servizio: ServizioKPI, host: str = "127.0.0.1", porta: int = 8765,
+                n_worker: int = 8) -> ServerConPool:
+    gestore = type("GestoreKPIConServizio", (GestoreKPI,), {"servizio": servizio})
+    return ServerConPool((host, porta), gestore, n_worker)
+
+# ==============================
+# CLIENT (HTTP e locale) E PROVA DI CARICO
+# ==============================
+
+class ClienteHTTP:
+    """Client minimale per il servizio; ricorda gli ETag e rimanda If-None-Match."""
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8765"):
+        self.base_url = base_url.rstrip("/")
+        self._etag = {}
+
+    def kpi(self, **parametri) -> tuple[int, dict | None]:
+        query = urlencode(parametri, doseq=True)
+        richiesta = Request(f"{self.base_url}/kpi?{query}")
+        if query in self._etag:
+            richiesta.add_header("If-None-Match", self._etag[query])
+        try:
+            with urlopen(richiesta) as r:
+                self._etag[query] = r.headers.get("ETag")
+                return r.status, json.loads(r.read())
+        except HTTPError as e:
+            if e.code == 304:
+                return 304, None
+            raise
+
+class ClienteLocale:
+    """Sostituto in-process del client HTTP: chiama direttamente ServizioKPI (utile per misurare il servizio senza rete)."""
+
+    def __init__(self, servizio: ServizioKPI):
+        self.servizio = servizio
+        self._etag = {}
+
+    def kpi(self, **parametri) -> tuple[int, dict | None]:
+        query = urlencode(parametri, doseq=True)
+        stato, intestazioni, corpo = self.servizio.rispondi(query, self._etag.get(query))
+        self._etag[query] = intestazioni.get("ETag")
+        return stato, (json.loads(corpo) if corpo else None)
+
+def richieste_di_prova(df: pd.DataFrame, n: int, seed: int = 0) -> list[dict]:
+    """Genero n query realistiche (combinazioni di vigneto, vitigno, mese e raggruppamento)."""
+    rng = np.random.default_rng(seed)
+    vigneti = sorted(df["vigneto"].dropna().unique().tolist())
+    vitigni = sorted(df["vitigno"].dropna().unique().tolist())
+    mesi = sorted(df["data"].dt.to_period("M").astype(str).unique().tolist())
+    richieste = []
+    for _ in range(n):
+        p = {}
+        if rng.random() < 0.6: p["vigneto"] = vigneti[rng.integers(len(vigneti))]
+        if rng.random() < 0.5: p["vitigno"] = vitigni[rng.integers(len(vitigni))]
+        if rng.random() < 0.5:
+            mese = pd.Period(mesi[rng.integers(len(mesi))])
+            p["dal"], p["al"] = str(mese.start_time.date()), str(mese.end_time.date())
+        if rng.random() < 0.3: p["per"] = RAGGRUPPAMENTI[rng.integers(len(RAGGRUPPAMENTI))]
+        richieste.append(p)
+    return richieste
+
+def prova_carico(cliente, richieste: list[dict], n_thread: int = 8) -> dict:
+    """Invio le richieste in parallelo e misuro throughput e latenze (ms)."""
+    latenze = []
+
+    def una(p):
+        t0 = time.perf_counter()
+        cliente.kpi(**p)
+        return (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_thread) as pool:
+        latenze = sorted(pool.map(una, richieste))
+    durata = time.perf_counter() - t0
+    return {
+        "richieste": len(richieste),
+        "durata_s": round(durata, 3),
+        "richieste_s": round(len(richieste) / durata, 1),
+        "latenza_p50_ms": round(latenze[len(latenze) // 2], 2),
+        "latenza_p95_ms": round(latenze[int(len(latenze) * 0.95) - 1], 2),
+    }
+
+# =====================
+# ESECUZIONE SCRIPT
+# =====================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servizio KPI locale – Cantina Corradino")
+    parser.add_argument("--dati", default="dati_vendemmia_corradino.csv", help="CSV, cartella o glob della vendemmia")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--worker", type=int, default=8, help="thread del pool che serve le richieste")
+    parser.add_argument("--cache", type=int, default=256, help="risposte tenute nella cache LRU")
+    parser.add_argument("--prova-carico", type=int, default=0, metavar="N",
+                        help="invece di restare in ascolto, invio N richieste di prova e stampo i tempi")
+    args = parser.parse_args()
+
+    servizio = ServizioKPI(carica_archivio(args.dati, "data"), capacita_cache=args.cache)
+    server = crea_server(servizio, args.host, args.porta, args.worker)
+
+    if args.prova_carico:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        richieste = richieste_di_prova(servizio.df, args.prova_carico)
+        clienti = {"Locale": lambda: ClienteLocale(servizio),
+                   "HTTP":   lambda: ClienteHTTP(f"http://{args.host}:{args.porta}")}
+        for nome, nuovo_cliente in clienti.items():
+            # ogni client parte con la cache vuota: prima passata a freddo (calcolo),
+            # seconda a caldo (cache e 304), così i due numeri non si mescolano
+            servizio.cache.svuota()
+            cliente = nuovo_cliente()
+            print(f"{nome} (freddo):", prova_carico(cliente, richieste, args.worker))
+            print(f"{nome} (caldo): ", prova_carico(cliente, richieste, args.worker))
+            print(f"{nome} cache:   ", servizio.salute())
+        server.shutdown()
+        server.server_close()
+    else:
+        print(f"Servizio KPI in ascolto su http://{args.host}:{args.porta} ({len(servizio.df)} righe in memoria)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -3,10 +3,21 @@
 # Autore: Giovanni Tumminello – Project Work Università Pegaso (L31)
 # Output: dati_vendemmia_corradino.csv e lotti_fermentazione_corradino.csv
 
-from datetime import date, timedelta
+import argparse
+import importlib.util
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import partial
+from pathlib import Path
 import numpy as np
 import pandas as pd
 
+from statistiche_online import RiepilogoVendemmia
+
 # ==============================
 # PARAMETRI DELLA SIMULAZIONE
 # ==============================
@@ -23,8 +34,66 @@ SCARTO_MIN, SCARTO_MAX = 0.25, 0.35
 INIZIO_VENDEMMIA = date(2025, 8, 25)
 FINE_VENDEMMIA   = date(2025, 10, 15)
 
+# coefficienti per vitigno:
+# (bonus probabilità di raccolta, scala resa kg, aggiustamento °Brix, aggiustamento acidità, resa media L/kg)
+PARAMETRI_VITIGNI = {
+    "Nero d'Avola": (1.1, 1.2,  1.0,  0.0, 0.66),
+    "Syrah":        (1.1, 1.1,  0.8,  0.0, 0.65),
+    "Malvasia":     (1.0, 0.9,  0.2, -0.1, 0.64),
+    "Catarratto":   (1.0, 1.0, -0.3,  0.2, 0.63),
+    "Petit Verdot": (1.0, 0.8,  0.6, -0.2, 0.62),
+    "Grillo":       (1.1, 1.1, -0.1,  0.0, 0.64),
+}
+PARAMETRI_DEFAULT = (1.0, 1.0, 0.0, 0.0, 0.64)  # per vitigni non in tabella
+
 rng = np.random.default_rng(42)
 
+# ==================================
+# REGISTRO VITIGNI / VIGNETI
+# ==================================
+
+class Registro:
+    """Assegno un codice intero a ogni nome (una volta sola); i codici indicizzano le tabelle NumPy."""
+
+    def __init__(self, nomi=()):
+        self.nomi = []
+        self.codici = {}
+        for nome in nomi:
+            self.codice(nome)
+
+    def codice(self, nome):
+        c = self.codici.get(nome)
+        if c is None:
+            c = self.codici[nome] = len(self.nomi)
+            self.nomi.append(nome)
+        return c
+
+    def __len__(self):
+        return len(self.nomi)
+
+REGISTRO_VITIGNI = Registro(PARAMETRI_VITIGNI)
+REGISTRO_VIGNETI = Registro()
+
+# tabelle dei coefficienti indicizzate per codice vitigno (le aggiorno con aggiorna_tabelle_vitigni)
+BONUS_RACCOLTA = SCALA_RACCOLTO = AGG_BRIX = AGG_ACIDITA = RESA_MEDIA = np.empty(0)
+
+def aggiorna_tabelle_vitigni():
+    """Ricostruisco le tabelle dei coefficienti dopo aver registrato nuovi vitigni."""
+    global BONUS_RACCOLTA, SCALA_RACCOLTO, AGG_BRIX, AGG_ACIDITA, RESA_MEDIA
+    tabella = np.array([PARAMETRI_VITIGNI.get(nome, PARAMETRI_DEFAULT) for nome in REGISTRO_VITIGNI.nomi],
+                       dtype=np.float64).reshape(-1, len(PARAMETRI_DEFAULT))
+    BONUS_RACCOLTA, SCALA_RACCOLTO, AGG_BRIX, AGG_ACIDITA, RESA_MEDIA = tabella.T.copy()
+
+aggiorna_tabelle_vitigni()
+
+def codice_vitigno(nome):
+    """Codice del vitigno (lo registro, con i coefficienti di default, se è nuovo)."""
+    nuovo = nome not in REGISTRO_VITIGNI.codici
+    c = REGISTRO_VITIGNI.codice(nome)
+    if nuovo:
+        aggiorna_tabelle_vitigni()
+    return c
+
 # ==================================
 # FUNZIONI DI SUPPORTO
 # ==================================
@@ -35,6 +104,10 @@ def intervallo_date(inizio, fine):
         yield giorno
         giorno += timedelta(days=1)
 
+def _limita(x, minimo, massimo):
+    """Come np.clip ma per un singolo numero (molto più veloce nel ciclo)."""
+    return min(max(x, minimo), massimo)
+
 def temperatura_giornaliera(data, altitudine):
     base = 30 - max(0, (data.timetuple().tm_yday - 240)) * 0.08
     rumore = rng.normal(0, 1.2)
@@ -47,42 +120,32 @@ def pioggia_giornaliera():
 
 def umidita_suolo(precedente, pioggia, irrigato):
     nuova = precedente + pioggia*0.5 + (5 if irrigato else 0) - 2.5
-    return float(np.clip(nuova, 10, 40))
+    return float(_limita(nuova, 10, 40))
 
-def raccolto_kg(vitigno, temperatura, pioggia, irrigato):
+def raccolto_kg(cod_vitigno, temperatura, pioggia, irrigato):
     prob_base = 0.10
-    fattore_temp = np.clip(1 - abs((temperatura - 28))/10, 0.6, 1.2)
+    fattore_temp = _limita(1 - abs((temperatura - 28))/10, 0.6, 1.2)
     penalita_pioggia = 0.5 if pioggia > 5 else 1.0
-    bonus_vitigno = 1.1 if vitigno in ["Nero d'Avola","Syrah","Grillo"] else 1.0
-    probabilita = prob_base * fattore_temp * penalita_pioggia * bonus_vitigno
+    probabilita = prob_base * fattore_temp * penalita_pioggia * BONUS_RACCOLTA[cod_vitigno]
     if rng.random() > probabilita:
         return 0.0
     base_media = 600
-    scala_vitigno = {
-        "Nero d'Avola": 1.2, "Syrah": 1.1, "Malvasia": 0.9,
-        "Catarratto": 1.0, "Petit Verdot": 0.8, "Grillo": 1.1
-    }.get(vitigno, 1.0)
     fattore_irrigazione = 2.0 if irrigato else 1.0
-    media = base_media * scala_vitigno * fattore_irrigazione
+    media = base_media * SCALA_RACCOLTO[cod_vitigno] * fattore_irrigazione
     return float(max(0, rng.normal(media, media*0.35)))
 
-def grado_zuccherino(vitigno, temperatura, pioggia, altitudine):
+def grado_zuccherino(cod_vitigno, temperatura, pioggia, altitudine):
     base = 22.5 + (temperatura - 26)*0.25 - (altitudine/600)*0.8 - (0.4 if pioggia > 5 else 0)
-    aggiustamento = {"Nero d'Avola":1.0, "Syrah":0.8, "Malvasia":0.2,
-                     "Catarratto":-0.3, "Petit Verdot":0.6, "Grillo":-0.1}.get(vitigno, 0)
-    valore = base + aggiustamento + rng.normal(0, 0.6)
-    return float(np.clip(valore, 18, 26))
+    valore = base + AGG_BRIX[cod_vitigno] + rng.normal(0, 0.6)
+    return float(_limita(valore, 18, 26))
 
-def acidita_mosto(vitigno, temperatura, altitudine):
+def acidita_mosto(cod_vitigno, temperatura, altitudine):
     base = 6.8 - (temperatura - 26)*0.1 + (altitudine/600)*0.4
-    aggiustamento = {"Malvasia": -0.1, "Catarratto": 0.2, "Petit Verdot": -0.2}.get(vitigno, 0)
-    valore = base + aggiustamento + rng.normal(0, 0.25)
-    return float(np.clip(valore, 5.5, 8.2))
+    valore = base + AGG_ACIDITA[cod_vitigno] + rng.normal(0, 0.25)
+    return float(_limita(valore, 5.5, 8.2))
 
-def resa_succo_litri_per_kg(vitigno):
-    medie = {"Nero d'Avola":0.66, "Syrah":0.65, "Malvasia":0.64,
-             "Catarratto":0.63, "Petit Verdot":0.62, "Grillo":0.64}
-    return float(np.clip(rng.normal(medie.get(vitigno, 0.64), 0.015), 0.60, 0.70))
+def resa_succo_litri_per_kg(cod_vitigno):
+    return float(_limita(rng.normal(RESA_MEDIA[cod_vitigno], 0.015), 0.60, 0.70))
 
 def costo_manodopera(kg_raccolti):
     return float(220 + 0.07 * kg_raccolti)
@@ -96,55 +159,122 @@ def altri_costi(irrigato, pioggia):
 # SIMULAZIONE VENDEMMIA 
 # =======================
 
-def simula_vendemmia(inizio=INIZIO_VENDEMMIA, fine=FINE_VENDEMMIA):
-    record = []
-    umidita = {v["nome"]: rng.uniform(14, 24) for v in VIGNETI}
-    
-    for giorno in intervallo_date(inizio, fine):
-        for v in VIGNETI:
-            nome, alt = v["nome"], v["altitudine_m"]
-            for vitigno in v["vitigni"]:
+COLONNE_VENDEMMIA = [
+    "data", "vigneto", "altitudine_m", "vitigno", "irrigato", "temperatura_C", "pioggia_mm",
+    "umidita_suolo_%", "siccita_flag", "raccolto_kg", "grado_zuccherino_Brix", "acidita_g_L",
+    "resa_succo_L_kg", "scarto_%", "costo_manodopera_€", "costo_totale_€", "ricavo_€", "margine_€",
+]
+TIPI_COLONNE = {"data": "datetime64[D]", "vigneto": np.int32, "altitudine_m": np.int32, "vitigno": np.int32,
+                "irrigato": np.int8, "siccita_flag": np.int8}  # tutte le altre sono float64
+GIORNI_PER_BLOCCO = 366  # blocchi usati per i riepiloghi in streaming (memoria limitata a un anno di righe)
+
+def _categoria(codici, registro, usati):
+    """Da codici interi a colonna categorica.
+
+    Le categorie sono solo i nomi usati nella simulazione (codici delle parcelle), in ordine
+    alfabetico come i gruppi di pandas: il registro è globale e contiene anche i nomi delle
+    simulazioni precedenti. Le ricavo dalle parcelle e non dal blocco, così tutti i blocchi
+    hanno le stesse categorie.
+    """
+    nomi = sorted({registro.nomi[c] for c in usati})
+    ricodifica = np.full(len(registro.nomi), -1, dtype=np.int32)
+    ricodifica[[registro.codici[nome] for nome in nomi]] = np.arange(len(nomi), dtype=np.int32)
+    return pd.Categorical.from_codes(ricodifica[codici], nomi)
+
+def _simula_blocchi(inizio=INIZIO_VENDEMMIA, fine=FINE_VENDEMMIA, giorni_per_blocco=None,
+                    vigneti=None, avanzamento=None):
+    """Cuore della simulazione: per ogni blocco di giorni riempio colonne NumPy preallocate e ritorno un DataFrame.
+
+    Se passo avanzamento, lo chiamo a fine giornata con (giorni simulati, giorni totali, righe generate).
+    """
+    vigneti = vigneti if vigneti is not None else VIGNETI
+    # parcelle (vigneto, altitudine, vitigno) già tradotte in codici: nel ciclo niente stringhe né dizionari
+    parcelle = [(REGISTRO_VIGNETI.codice(v["nome"]), v["altitudine_m"], codice_vitigno(vitigno))
+                for v in vigneti for vitigno in v["vitigni"]]
+    umidita = {REGISTRO_VIGNETI.codice(v["nome"]): rng.uniform(14, 24) for v in vigneti}
+
+    giorni = list(intervallo_date(inizio, fine))
+    passo = giorni_per_blocco or max(1, len(giorni))
+    for k in range(0, len(giorni), passo):
+        blocco = giorni[k:k + passo]
+        n = len(blocco) * len(parcelle)
+        col = {c: np.empty(n, dtype=TIPI_COLONNE.get(c, np.float64)) for c in COLONNE_VENDEMMIA}
+        (c_data, c_vig, c_alt, c_vit, c_irr, c_temp, c_piog, c_umid, c_sicc, c_kg,
+         c_brix, c_acid, c_resa, c_scarto, c_lavoro, c_costo, c_ricavo, c_margine) = col.values()
+
+        i = 0
+        for g, giorno in enumerate(blocco, start=k + 1):
+            giorno_np = np.datetime64(giorno, "D")
+            for cod_vig, alt, cod_vit in parcelle:
                 irrigato = 1 if rng.random() < PERCENTUALE_IRRIGAZIONE else 0
                 temp = temperatura_giornaliera(giorno, alt)
                 pioggia = pioggia_giornaliera()
-                umidita[nome] = umidita_suolo(umidita[nome], pioggia, irrigato)
-                siccita = 1 if (pioggia == 0.0 and umidita[nome] < 15) else 0
+                umidita[cod_vig] = umidita_suolo(umidita[cod_vig], pioggia, irrigato)
+                siccita = 1 if (pioggia == 0.0 and umidita[cod_vig] < 15) else 0
 
-                kg = raccolto_kg(vitigno, temp, pioggia, irrigato)
+                kg = raccolto_kg(cod_vit, temp, pioggia, irrigato)
                 if kg > 0:
-                    brix = grado_zuccherino(vitigno, temp, pioggia, alt)
-                    acid = acidita_mosto(vitigno, temp, alt)
-                    resa = resa_succo_litri_per_kg(vitigno)
+                    brix = grado_zuccherino(cod_vit, temp, pioggia, alt)
+                    acid = acidita_mosto(cod_vit, temp, alt)
+                    resa = resa_succo_litri_per_kg(cod_vit)
                     scarto = rng.uniform(SCARTO_MIN, SCARTO_MAX)
+                    c_brix[i], c_acid[i] = round(brix, 1), round(acid, 2)
+                    c_resa[i], c_scarto[i] = round(resa, 3), round(scarto, 3)
+                    ricavo = (kg * resa) * 1.1
                 else:
-                    brix = acid = resa = scarto = np.nan
+                    c_brix[i] = c_acid[i] = c_resa[i] = c_scarto[i] = np.nan
+                    ricavo = 0.0
 
                 costo_lavoro = costo_manodopera(kg)
                 costo_totale = costo_lavoro + altri_costi(irrigato, pioggia)
-                ricavo = (kg * (resa if not np.isnan(resa) else 0.64)) * 1.1 if kg > 0 else 0.0
-                margine = ricavo - costo_totale
-
-                record.append({
-                    "data": giorno.isoformat(),
-                    "vigneto": nome,
-                    "altitudine_m": alt,
-                    "vitigno": vitigno,
-                    "irrigato": irrigato,
-                    "temperatura_C": temp,
-                    "pioggia_mm": pioggia,
-                    "umidita_suolo_%": round(umidita[nome], 1),
-                    "siccita_flag": siccita,
-                    "raccolto_kg": round(kg, 1),
-                    "grado_zuccherino_Brix": round(brix, 1) if not np.isnan(brix) else "",
-                    "acidita_g_L": round(acid, 2) if not np.isnan(acid) else "",
-                    "resa_succo_L_kg": round(resa, 3) if not np.isnan(resa) else "",
-                    "scarto_%": round(scarto, 3) if not np.isnan(scarto) else "",
-                    "costo_manodopera_€": round(costo_lavoro, 2),
-                    "costo_totale_€": round(costo_totale, 2),
-                    "ricavo_€": round(ricavo, 2),
-                    "margine_€": round(margine, 2)
-                })
-    return pd.DataFrame(record)
+
+                c_data[i], c_vig[i], c_alt[i], c_vit[i] = giorno_np, cod_vig, alt, cod_vit
+                c_irr[i], c_temp[i], c_piog[i] = irrigato, temp, pioggia
+                c_umid[i], c_sicc[i], c_kg[i] = round(umidita[cod_vig], 1), siccita, round(kg, 1)
+                c_lavoro[i], c_costo[i] = round(costo_lavoro, 2), round(costo_totale, 2)
+                c_ricavo[i], c_margine[i] = round(ricavo, 2), round(ricavo - costo_totale, 2)
+                i += 1
+            if avanzamento is not None:
+                avanzamento(g, len(giorni), g * len(parcelle))
+
+        col["vigneto"] = _categoria(c_vig, REGISTRO_VIGNETI, [p[0] for p in parcelle])
+        col["vitigno"] = _categoria(c_vit, REGISTRO_VITIGNI, [p[2] for p in parcelle])
+        yield pd.DataFrame(col, columns=COLONNE_VENDEMMIA)
+
+def simula_vendemmia(inizio=INIZIO_VENDEMMIA, fine=FINE_VENDEMMIA, riepilogo=None,
+                     vigneti=None, avanzamento=None):
+    """Simulo la vendemmia e ritorno il DataFrame; se passo un riepilogo, lo aggiorno con le righe generate."""
+    df = next(_simula_blocchi(inizio, fine, vigneti=vigneti, avanzamento=avanzamento), None)
+    if df is None:
+        df = pd.DataFrame(columns=COLONNE_VENDEMMIA)
+    if riepilogo is not None:
+        riepilogo.aggiorna_df(df)
+    return df
+
+# ==========================================
+# RIEPILOGHI IN STREAMING (SENZA RIGHE)
+# ==========================================
+
+def riassumi_vendemmia(inizio=INIZIO_VENDEMMIA, fine=FINE_VENDEMMIA, riepilogo=None):
+    """Simulo la vendemmia tenendo solo le statistiche online (memoria O(blocco + vigneti x vitigni))."""
+    riepilogo = riepilogo if riepilogo is not None else RiepilogoVendemmia()
+    for blocco in _simula_blocchi(inizio, fine, GIORNI_PER_BLOCCO):
+        riepilogo.aggiorna_df(blocco)
+    return riepilogo
+
+def _riassumi_con_seme(seme, inizio, fine):
+    """Worker per l'ensemble: ogni processo usa il proprio generatore casuale."""
+    global rng
+    rng = np.random.default_rng(seme)
+    return riassumi_vendemmia(inizio, fine)
+
+def riassumi_ensemble(semi, inizio=INIZIO_VENDEMMIA, fine=FINE_VENDEMMIA, n_processi=None):
+    """Eseguo una simulazione per seme in processi separati e unisco i riepiloghi parziali."""
+    totale = RiepilogoVendemmia()
+    with ProcessPoolExecutor(max_workers=n_processi) as pool:
+        for parziale in pool.map(partial(_riassumi_con_seme, inizio=inizio, fine=fine), semi):
+            totale.unisci(parziale)
+    return totale
 
 # =========================================
 # CREAZIONE LOTTI DI FERMENTAZIONE
@@ -157,7 +287,7 @@ def crea_lotti_fermentazione(df_vendemmia):
     
     df["data"] = pd.to_datetime(df["data"])
     lotti = []
-    for (vigneto, vitigno), gruppo in df.groupby(["vigneto", "vitigno"]):
+    for (vigneto, vitigno), gruppo in df.groupby(["vigneto", "vitigno"], observed=True):
         gruppo = gruppo.sort_values("data").reset_index(drop=True)
         i = 0
         while i < len(gruppo):
@@ -200,9 +330,127 @@ def crea_lotti_fermentazione(df_vendemmia):
 # ESECUZIONE SCRIPT
 # =====================
 
-if __name__ == "__main__":
-    df_vendemmia = simula_vendemmia()
+FORMATI = {"csv": ".csv", "json": ".json", "parquet": ".parquet"}
+
+def carica_vigneti(percorso):
+    """Leggo i vigneti da un file JSON: lista di {"nome", "altitudine_m", "vitigni"}."""
+    with open(percorso, encoding="utf-8") as fh:
+        vigneti = json.load(fh)
+    if not isinstance(vigneti, list) or not all(isinstance(v, dict) for v in vigneti):
+        raise ValueError("Il file dei vigneti deve contenere una lista di oggetti")
+    for v in vigneti:
+        mancanti = {"nome", "altitudine_m", "vitigni"} - set(v)
+        if mancanti:
+            raise ValueError(f"Vigneto {v.get('nome', '?')}: mancano i campi {', '.join(sorted(mancanti))}")
+        # una stringa verrebbe presa come un vitigno per carattere
+        if not isinstance(v["vitigni"], list) or not all(isinstance(x, str) for x in v["vitigni"]):
+            raise ValueError(f"Vigneto {v['nome']}: 'vitigni' deve essere una lista di nomi")
+    return vigneti
+
+def motore_parquet():
+    """Libreria per scrivere parquet (pyarrow o fastparquet), None se non ce n'è nessuna."""
+    return next((m for m in ("pyarrow", "fastparquet") if importlib.util.find_spec(m)), None)
+
+def salva(df, percorso, formato):
+    if formato == "csv":
+        df.to_csv(percorso, index=False)
+    elif formato == "json":
+        df.to_json(percorso, orient="records", date_format="iso", date_unit="s", force_ascii=False)
+    else:
+        df.to_parquet(percorso, index=False)  # serve pyarrow (o fastparquet), controllato in main
+
+def picco_memoria_mb():
+    """Picco di memoria del processo (RSS massimo); None dove il modulo resource non esiste (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    picco = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux riporta KB, macOS byte
+    return round(picco / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class Avanzamento:
+    """Stampo l'avanzamento su stderr al massimo una volta ogni `intervallo` secondi."""
+
+    def __init__(self, intervallo=1.0):
+        self.intervallo = intervallo
+        self.t0 = time.perf_counter()
+        self.ultimo = self.t0
+
+    def __call__(self, giorni, totale, righe):
+        adesso = time.perf_counter()
+        if adesso - self.ultimo < self.intervallo and giorni < totale:
+            return
+        self.ultimo = adesso
+        velocita = righe / max(adesso - self.t0, 1e-9)
+        print(f"  giorno {giorni}/{totale} ({giorni / totale:.0%}) – {righe} righe – {velocita:,.0f} righe/s",
+              file=sys.stderr, flush=True)
+
+def main(argv=None):
+    global rng
+    parser = argparse.ArgumentParser(description="Simulatore vendemmia – Cantina Corradino")
+    parser.add_argument("--inizio", type=date.fromisoformat, default=INIZIO_VENDEMMIA, help="primo giorno (AAAA-MM-GG)")
+    parser.add_argument("--fine", type=date.fromisoformat, default=FINE_VENDEMMIA, help="ultimo giorno (AAAA-MM-GG)")
+    parser.add_argument("--vigneti", help="file JSON con i vigneti (default: quelli della Cantina Corradino)")
+    parser.add_argument("--seed", type=int, default=42, help="seme del generatore casuale")
+    parser.add_argument("--formato", choices=sorted(FORMATI), default="csv", help="formato dei file di output")
+    parser.add_argument("--output-dir", default=".", help="cartella dei file di output")
+    parser.add_argument("--metriche", help="scrivo qui (JSON) tempi, righe/s e picco di memoria")
+    parser.add_argument("--silenzioso", action="store_true", help="niente avanzamento su stderr")
+    args = parser.parse_args(argv)
+    if args.fine < args.inizio:
+        parser.error("--fine deve essere uguale o successiva a --inizio")
+    # controllo prima di simulare, non dopo minuti di calcolo al momento di salvare
+    if args.formato == "parquet" and motore_parquet() is None:
+        parser.error("--formato parquet richiede pyarrow (pip install pyarrow) o fastparquet")
+    try:
+        vigneti = carica_vigneti(args.vigneti) if args.vigneti else VIGNETI
+    except (OSError, ValueError) as e:
+        parser.error(f"--vigneti: {e}")
+
+    rng = np.random.default_rng(args.seed)
+    cartella = Path(args.output_dir)
+    cartella.mkdir(parents=True, exist_ok=True)
+    estensione = FORMATI[args.formato]
+
+    tempi = {}
+    t0 = time.perf_counter()
+    df_vendemmia = simula_vendemmia(args.inizio, args.fine, vigneti=vigneti,
+                                    avanzamento=None if args.silenzioso else Avanzamento())
+    tempi["simulazione"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
     df_lotti = crea_lotti_fermentazione(df_vendemmia)
-    df_vendemmia.to_csv("dati_vendemmia_corradino.csv", index=False)
-    df_lotti.to_csv("lotti_fermentazione_corradino.csv", index=False)
-    print(f"✅ Simulazione completata: {len(df_vendemmia)} righe vendemmia, {len(df_lotti)} lotti generati.")
+    tempi["lotti"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    salva(df_vendemmia, cartella / f"dati_vendemmia_corradino{estensione}", args.formato)
+    salva(df_lotti, cartella / f"lotti_fermentazione_corradino{estensione}", args.formato)
+    tempi["serializzazione"] = time.perf_counter() - t0
+    tempi["totale"] = sum(tempi.values())
+
+    righe = len(df_vendemmia)
+    metriche = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "parametri": {"inizio": args.inizio.isoformat(), "fine": args.fine.isoformat(), "seed": args.seed,
+                      "formato": args.formato, "vigneti": args.vigneti,
+                      "parcelle": sum(len(v["vitigni"]) for v in vigneti)},
+        "righe_vendemmia": righe,
+        "lotti": len(df_lotti),
+        "tempi_s": {k: round(v, 4) for k, v in tempi.items()},
+        "righe_al_secondo": round(righe / tempi["simulazione"], 1) if tempi["simulazione"] > 0 else None,
+        "righe_al_secondo_totale": round(righe / tempi["totale"], 1) if tempi["totale"] > 0 else None,
+        "picco_memoria_MB": picco_memoria_mb(),
+        "python": platform.python_version(),
+    }
+    if args.metriche:
+        Path(args.metriche).write_text(json.dumps(metriche, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print(f"✅ Simulazione completata: {righe} righe vendemmia, {len(df_lotti)} lotti generati.")
+    print(f"   Tempi: simulazione {tempi['simulazione']:.2f} s, lotti {tempi['lotti']:.2f} s, "
+          f"serializzazione {tempi['serializzazione']:.2f} s – {metriche['righe_al_secondo']:,.0f} righe/s"
+          + (f" – picco memoria {metriche['picco_memoria_MB']} MB" if metriche["picco_memoria_MB"] is not None else ""))
+    return metriche
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+# statistiche_online.py
+# Statistiche "in streaming" per il simulatore: aggiorno i riepiloghi un blocco di righe alla volta
+# senza tenere in memoria il DataFrame completo. Tutti gli accumulatori si possono unire
+# (unisci) per combinare i risultati parziali di più processi/simulazioni.
+#
+# - Welford: conteggio, media, varianza, min e max (unione esatta, formula di Chan)
+# - SketchQuantili: quantili approssimati stile KLL, memoria O(k log(n/k))
+# - RiepilogoVendemmia: conteggi e statistiche per (vigneto, vitigno), memoria O(chiavi)
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# ==============================
+# MEDIA E VARIANZA (WELFORD)
+# ==============================
+
+class Welford:
+    """Media e varianza online (algoritmo di Welford); i valori NaN vengono ignorati."""
+
+    __slots__ = ("n", "media", "m2", "minimo", "massimo")
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.massimo = -math.inf
+
+    def aggiorna(self, x: float):
+        if x is None or x != x:  # NaN
+            return
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+        self.minimo = min(self.minimo, x)
+        self.massimo = max(self.massimo, x)
+
+    def aggiorna_array(self, valori):
+        """Aggiungo un blocco di valori in un colpo solo (statistiche del blocco + unione)."""
+        v = np.asarray(valori, dtype=float)
+        v = v[~np.isnan(v)]
+        if v.size == 0:
+            return
+        blocco = Welford()
+        blocco.n = int(v.size)
+        blocco.media = float(v.mean())
+        blocco.m2 = float(((v - blocco.media) ** 2).sum())
+        blocco.minimo = float(v.min())
+        blocco.massimo = float(v.max())
+        self.unisci(blocco)
+
+    def unisci(self, altro: "Welford") -> "Welford":
+        """Unione esatta di due accumulatori (Chan et al.)."""
+        if altro.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.media, self.m2 = altro.n, altro.media, altro.m2
+            self.minimo, self.massimo = altro.minimo, altro.massimo
+            return self
+        n = self.n + altro.n
+        delta = altro.media - self.media
+        self.media += delta * altro.n / n
+        self.m2 += altro.m2 + delta * delta * self.n * altro.n / n
+        self.n = n
+        self.minimo = min(self.minimo, altro.minimo)
+        self.massimo = max(self.massimo, altro.massimo)
+        return self
+
+    @property
+    def varianza(self) -> float:
+        """Varianza campionaria (n - 1)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else float("nan")
+
+    @property
+    def dev_std(self) -> float:
+        return math.sqrt(self.varianza) if self.n > 1 else float("nan")
+
+# ==============================
+# QUANTILI APPROSSIMATI (KLL)
+# ==============================
+
+class SketchQuantili:
+    """Sketch di quantili stile KLL: livelli di compattatori, il livello h pesa 2**h.
+
+    L'errore sul rango è dell'ordine di 1/k (con k=200 circa 1–2% dei valori) e resta
+    tale anche dopo l'unione di sketch costruiti da processi diversi. La compattazione
+    alterna in modo deterministico gli elementi pari/dispari, così a parità di dati il
+    risultato è riproducibile.
+    """
+
+    def __init__(self, k: int = 200):
+        self.k = k
+        self.n = 0
+        self.livelli = [[]]
+        self._alterna = 0
+
+    def _capacita(self, h: int) -> int:
+        profondita = len(self.livelli) - 1 - h
+        return max(2, int(math.ceil(self.k * (2 / 3) ** profondita)))
+
+    def _comprimi(self):
+        h = 0
+        while h < len(self.livelli):
+            livello = self.livelli[h]
+            if len(livello) >= self._capacita(h):
+                if h + 1 == len(self.livelli):
+                    self.livelli.append([])
+                livello.sort()
+                # se dispari ne lascio uno al livello corrente, così il peso totale resta esatto
+                resto = [livello.pop()] if len(livello) % 2 else []
+                self.livelli[h + 1].extend(livello[self._alterna::2])
+                self._alterna ^= 1
+                self.livelli[h] = resto
+            h += 1
+
+    def aggiorna(self, x: float):
+        if x is None or x != x:
+            return
+        self.livelli[0].append(float(x))
+        self.n += 1
+        if len(self.livelli[0]) >= self._capacita(0):
+            self._comprimi()
+
+    def aggiorna_array(self, valori):
+        v = np.asarray(valori, dtype=float)
+        v = v[~np.isnan(v)]
+        if v.size == 0:
+            return
+        self.livelli[0].extend(v.tolist())
+        self.n += int(v.size)
+        while any(len(l) >= self._capacita(h) for h, l in enumerate(self.livelli)):
+            self._comprimi()
+
+    def unisci(self, altro: "SketchQuantili") -> "SketchQuantili":
+        while len(self.livelli) < len(altro.livelli):
+            self.livelli.append([])
+        for h, livello in enumerate(altro.livelli):
+            self.livelli[h].extend(livello)
+        self.n += altro.n
+        while any(len(l) >= self._capacita(h) for h, l in enumerate(self.livelli)):
+            self._comprimi()
+        return self
+
+    def quantili(self, qs) -> list[float]:
+        """Quantili approssimati (qs tra 0 e 1)."""
+        valori, pesi = [], []
+        for h, livello in enumerate(self.livelli):
+            valori.extend(livello)
+            pesi.extend([2 ** h] * len(livello))
+        if not valori:
+            return [float("nan")] * len(qs)
+        ordine = np.argsort(valori, kind="stable")
+        v = np.asarray(valori)[ordine]
+        cum = np.cumsum(np.asarray(pesi)[ordine])
+        totale = cum[-1]
+        return [float(v[min(int(np.searchsorted(cum, q * totale)), len(v) - 1)]) for q in qs]
+
+    def quantile(self, q: float) -> float:
+        return self.quantili([q])[0]
+
+    @property
+    def elementi(self) -> int:
+        """Valori effettivamente tenuti in memoria."""
+        return sum(len(l) for l in self.livelli)
+
+# ==============================
+# RIEPILOGO VENDEMMIA PER CHIAVE
+# ==============================
+
+# colonne con media/varianza e colonne con anche i quantili
+COLONNE_MEDIE = ["raccolto_kg", "grado_zuccherino_Brix", "acidita_g_L", "resa_succo_L_kg", "margine_€"]
+COLONNE_QUANTILI = ["grado_zuccherino_Brix", "acidita_g_L", "margine_€"]
+QUANTILI = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+class StatisticheChiave:
+    """Accumulatori di una singola chiave (vigneto, vitigno)."""
+
+    def __init__(self, k: int = 200):
+        self.righe = 0
+        self.righe_con_raccolto = 0
+        self.irrigate = 0
+        self.siccita = 0
+        self.somme = {"raccolto_kg": 0.0, "costo_totale_€": 0.0, "ricavo_€": 0.0, "margine_€": 0.0}
+        self.medie = {c: Welford() for c in COLONNE_MEDIE}
+        self.sketch = {c: SketchQuantili(k) for c in COLONNE_QUANTILI}
+
+    def unisci(self, altro: "StatisticheChiave") -> "StatisticheChiave":
+        self.righe += altro.righe
+        self.righe_con_raccolto += altro.righe_con_raccolto
+        self.irrigate += altro.irrigate
+        self.siccita += altro.siccita
+        for c in self.somme:
+            self.somme[c] += altro.somme[c]
+        for c in self.medie:
+            self.medie[c].unisci(altro.medie[c])
+        for c in self.sketch:
+            self.sketch[c].unisci(altro.sketch[c])
+        return self
+
+class RiepilogoVendemmia:
+    """Riepilogo online dell'output del simulatore, per (vigneto, vitigno)."""
+
+    def __init__(self, k: int = 200):
+        self.k = k
+        self.chiavi: dict[tuple[str, str], StatisticheChiave] = {}
+
+    def _stat(self, chiave) -> StatisticheChiave:
+        s = self.chiavi.get(chiave)
+        if s is None:
+            s = self.chiavi[chiave] = StatisticheChiave(self.k)
+        return s
+
+    def aggiorna_df(self, df: pd.DataFrame):
+        """Aggiungo un blocco di righe del simulatore (DataFrame di _simula_blocchi, celle vuote = NaN),
+        in modo vettoriale per gruppo."""
+        for chiave, g in df.groupby(["vigneto", "vitigno"], observed=True, sort=False):
+            s = self._stat(tuple(chiave))
+            kg = pd.to_numeric(g["raccolto_kg"], errors="coerce").fillna(0)
+            s.righe += len(g)
+            s.righe_con_raccolto += int((kg > 0).sum())
+            s.irrigate += int(g["irrigato"].sum())
+            s.siccita += int(g["siccita_flag"].sum())
+            for c in s.somme:
+                s.somme[c] += float(pd.to_numeric(g[c], errors="coerce").sum())
+            for c in COLONNE_MEDIE:
+                s.medie[c].aggiorna_array(pd.to_numeric(g[c], errors="coerce").to_numpy(dtype=float))
+            for c in COLONNE_QUANTILI:
+                s.sketch[c].aggiorna_array(pd.to_numeric(g[c], errors="coerce").to_numpy(dtype=float))
+
+    def unisci(self, altro: "RiepilogoVendemmia") -> "RiepilogoVendemmia":
+        """Unisco il riepilogo di un altro worker (stesse chiavi o chiavi nuove)."""
+        for chiave, s in altro.chiavi.items():
+            self._stat(chiave).unisci(s)
+        return self
+
+    def totale(self) -> StatisticheChiave:
+        """Statistiche di tutte le chiavi insieme."""
+        tot = StatisticheChiave(self.k)
+        for s in self.chiavi.values():
+            tot.unisci(s)
+        return tot
+
+    def tabella(self, con_totale: bool = True) -> pd.DataFrame:
+        """Una riga per (vigneto, vitigno) con conteggi, somme, medie, deviazioni standard e quantili."""
+        elementi = sorted(self.chiavi.items())
+        if con_totale and elementi:
+            elementi.append((("Totale", "Totale"), self.totale()))
+        righe = []
+        for (vigneto, vitigno), s in elementi:
+            riga = {"vigneto": vigneto, "vitigno": vitigno, "righe": s.righe,
+                    "righe_con_raccolto": s.righe_con_raccolto, "irrigate": s.irrigate, "siccita": s.siccita}
+            riga.update({f"somma_{c}": v for c, v in s.somme.items()})
+            for c, w in s.medie.items():
+                riga[f"media_{c}"] = w.media if w.n else float("nan")
+                riga[f"dev_std_{c}"] = w.dev_std
+            for c, sk in s.sketch.items():
+                for q, v in zip(QUANTILI, sk.quantili(QUANTILI)):
+                    riga[f"p{int(q * 100)}_{c}"] = v
+            righe.append(riga)
+        return pd.DataFrame(righe)